@@ -0,0 +1,75 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from jobdone.analyzers.nlp import DocumentCache, text_hash
+from jobdone.metrics.spans import timed
+
+US_STATES = (
+    'AL|AK|AZ|AR|CA|CO|CT|DE|DC|FL|GA|HI|ID|IL|IN|IA|KS|KY|LA|ME|MD|MA|MI|MN|MS|MO|MT|NE|NV|'
+    'NH|NJ|NM|NY|NC|ND|OH|OK|OR|PA|RI|SC|SD|TN|TX|UT|VT|VA|WA|WV|WI|WY'
+)
+
+# Every fact pattern in one alternation so a posting is scanned once. At each
+# position the first alternative that matches wins, so the more specific
+# patterns come first.
+FACT_PATTERN = re.compile('|'.join([
+    r'(?P<experience>(?i:\b(?P<years>\d+\+?\s*-?\s*\d*)\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)\b))',
+    r'(?P<salary>\$\s*(?:\d{1,3},)*\d{1,3}(?:k|K)?\s*(?:-\s*\$\s*(?:\d{1,3},)*\d{1,3}(?:k|K)?)?(?:\s*\/\s*(?:year|yr|month|mo|annual|annually))?)',
+    r'(?P<skill>\b(?:Python|Java|JavaScript|React|AWS|SQL|Docker|Kubernetes|Azure|Git|REST|API|ML|AI|Node\.js|TypeScript|Angular|Vue\.js|PHP|C\+\+|Swift|Kotlin|Ruby|Go|Rust|HTML|CSS|MongoDB|PostgreSQL|MySQL)\b)',
+    r'(?P<education>\b(?:Bachelor\'?s?|Master\'?s?|PhD|BS|MS|BA|MBA|MD)\b)',
+    r'(?P<arrangement>(?i:\b(?:remote|hybrid|on-site|onsite|in-office)\b))',
+    rf'(?P<place>\b[A-Z][a-zA-Z]+(?:[ \t]+[A-Z][a-zA-Z]+)*,[ \t]*(?:{US_STATES}|USA)\b'
+    r'|\b(?:United States|Canada|UK|Australia|New Zealand|India)\b)',
+]))
+
+@dataclass(frozen=True)
+class JobFacts:
+    experience: Optional[str]
+    location: str
+    salary: Optional[str]
+    education: Optional[str]
+    skills: Tuple[str, ...]
+
+_facts_cache = DocumentCache(maxsize=1024)
+
+def extract_job_facts(job_desc_text):
+    """Extract the key facts of a job posting in one scan; memoized by text hash."""
+    key = text_hash(job_desc_text)
+    facts = _facts_cache.get(key)
+    if facts is not None:
+        return facts
+    return _scan_job_facts(key, job_desc_text)
+
+@timed('job_facts.scan')
+def _scan_job_facts(key, job_desc_text):
+    first = {}
+    skills = []
+    remote = False
+    for match in FACT_PATTERN.finditer(job_desc_text):
+        kind = match.lastgroup
+        if kind == 'experience':
+            # lastgroup names the outermost group; the number is in 'years'
+            first.setdefault(kind, match.group('years').strip())
+        elif kind == 'skill':
+            skills.append(match.group())
+        elif kind == 'arrangement':
+            remote = remote or match.group().lower() == 'remote'
+            first.setdefault(kind, match.group().capitalize())
+        else:
+            first.setdefault(kind, match.group())
+
+    # Remote wins over any place name; a named place wins over hybrid/on-site
+    if remote:
+        location = "Remote"
+    else:
+        location = first.get('place') or first.get('arrangement') or "Unknown"
+
+    facts = JobFacts(
+        experience=first.get('experience'),
+        location=location,
+        salary=first.get('salary'),
+        education=first.get('education'),
+        skills=tuple(skills),
+    )
+    _facts_cache.put(key, facts)
+    return facts
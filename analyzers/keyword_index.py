@@ -0,0 +1,176 @@
+import gzip
+import json
+import os
+import sys
+import threading
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc
+from jobdone.analyzers.nlp import DEFAULT_MODEL, load_model
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_TAXONOMY = os.path.join(DATA_DIR, 'skills.txt')
+COMPILED_FORMAT = 1
+
+
+def _has_lemmas(nlp):
+    return 'lemmatizer' in nlp.pipe_names
+
+
+class KeywordIndex:
+    """Compiled phrase matcher over a set of keywords.
+
+    Each keyword may have several token patterns (aliases). Resumes are
+    matched in one linear pass per attribute: LOWER for exact surface forms
+    and, when the pipeline has a lemmatizer, LEMMA for inflected variants.
+    """
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.keywords = []
+        self.lower_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+        self.lemma_matcher = PhraseMatcher(nlp.vocab, attr='LEMMA') if _has_lemmas(nlp) else None
+
+    def add(self, keyword, patterns):
+        """Add `keyword` with patterns given as (words, lemmas) pairs."""
+        patterns = [(words, lemmas) for words, lemmas in patterns if words]
+        if not patterns:
+            return
+        if keyword not in self.keywords:
+            self.keywords.append(keyword)
+
+        self.lower_matcher.add(keyword, [Doc(self.nlp.vocab, words=words) for words, _ in patterns])
+        if self.lemma_matcher is not None:
+            lemma_docs = [Doc(self.nlp.vocab, words=words, lemmas=lemmas)
+                          for words, lemmas in patterns if lemmas]
+            if lemma_docs:
+                self.lemma_matcher.add(keyword, lemma_docs)
+
+    def match(self, doc):
+        """Return the keywords that occur in `doc`, in order of first occurrence."""
+        matches = list(self.lower_matcher(doc))
+        if self.lemma_matcher is not None:
+            matches.extend(self.lemma_matcher(doc))
+
+        strings = self.nlp.vocab.strings
+        found = {}
+        for match_id, start, _ in sorted(matches, key=lambda match: match[1]):
+            found.setdefault(strings[match_id], start)
+        return list(found)
+
+    def __len__(self):
+        return len(self.keywords)
+
+
+class SkillTaxonomy:
+    """Skills loaded from a taxonomy file, tokenized once and stored compiled.
+
+    The compiled form holds the words and lemmas of every alias so later
+    loads build the matcher without running the pipeline over the taxonomy.
+    """
+
+    def __init__(self, entries, model=DEFAULT_MODEL):
+        # entries: [(skill, [(words, lemmas), ...]), ...]
+        self.entries = entries
+        self.model = model
+        self.patterns = dict(entries)
+        self._index = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_source(path=DEFAULT_TAXONOMY):
+        skills = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                names = [name.strip().lower() for name in line.split('|') if name.strip()]
+                skills.append((names[0], names))
+        return skills
+
+    @classmethod
+    def compile(cls, path=DEFAULT_TAXONOMY, model=DEFAULT_MODEL):
+        nlp = load_model(model)
+        skills = cls.read_source(path)
+        aliases = [alias for _, names in skills for alias in names]
+        docs = iter(nlp.pipe(aliases))
+        entries = []
+        for skill, names in skills:
+            patterns = []
+            for _ in names:
+                doc = next(docs)
+                words = [token.text for token in doc]
+                lemmas = [token.lemma_ for token in doc] if _has_lemmas(nlp) else None
+                patterns.append((words, lemmas))
+            entries.append((skill, patterns))
+        return cls(entries, model)
+
+    @staticmethod
+    def compiled_path(path=DEFAULT_TAXONOMY, model=DEFAULT_MODEL):
+        return f"{os.path.splitext(path)[0]}.{model}.compiled.json.gz"
+
+    def save(self, path):
+        data = {'format': COMPILED_FORMAT, 'model': self.model, 'entries': self.entries}
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_TAXONOMY, model=DEFAULT_MODEL):
+        """Load the compiled taxonomy, recompiling it when the source is newer."""
+        compiled = cls.compiled_path(path, model)
+        try:
+            if os.path.getmtime(compiled) >= os.path.getmtime(path):
+                with gzip.open(compiled, 'rt', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data['format'] == COMPILED_FORMAT and data['model'] == model:
+                    entries = [(skill, [(words, lemmas) for words, lemmas in patterns])
+                               for skill, patterns in data['entries']]
+                    return cls(entries, model)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        taxonomy = cls.compile(path, model)
+        try:
+            taxonomy.save(compiled)
+        except OSError as e:
+            # Read-only installs still work, they just compile on every start
+            print(f"Could not save compiled skill taxonomy: {str(e)}")
+        return taxonomy
+
+    def index(self):
+        """The process-wide KeywordIndex over every skill in the taxonomy."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = KeywordIndex(load_model(self.model))
+                    for skill, patterns in self.entries:
+                        index.add(skill, patterns)
+                    self._index = index
+        return self._index
+
+
+_taxonomies = {}
+_taxonomies_lock = threading.Lock()
+
+
+def get_taxonomy(path=DEFAULT_TAXONOMY, model=DEFAULT_MODEL):
+    key = (path, model)
+    taxonomy = _taxonomies.get(key)
+    if taxonomy is None:
+        with _taxonomies_lock:
+            taxonomy = _taxonomies.get(key)
+            if taxonomy is None:
+                taxonomy = SkillTaxonomy.load(path, model)
+                _taxonomies[key] = taxonomy
+    return taxonomy
+
+
+if __name__ == "__main__":
+    # python -m jobdone.analyzers.keyword_index [taxonomy.txt] [model]
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TAXONOMY
+    model = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL
+    taxonomy = SkillTaxonomy.compile(source, model)
+    taxonomy.save(SkillTaxonomy.compiled_path(source, model))
+    print(f"Compiled {len(taxonomy.entries)} skills to {SkillTaxonomy.compiled_path(source, model)}")
@@ -1,30 +1,68 @@
-import spacy
 from collections import Counter
+from jobdone.analyzers.keyword_index import DEFAULT_TAXONOMY, KeywordIndex, get_taxonomy
+from jobdone.analyzers.nlp import DEFAULT_MODEL, DocumentCache, load_model, parse, parse_many
+from jobdone.metrics.spans import timed
+
+# Compiled keyword indexes, one per job description
+job_index_cache = DocumentCache(maxsize=64)
 
 class KeywordMatcher:
-    def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
+    def __init__(self, model=DEFAULT_MODEL, taxonomy_path=DEFAULT_TAXONOMY):
+        self.model = model
+        self.nlp = load_model(model)
+        self.taxonomy_path = taxonomy_path
     
+    @timed('keywords.find_matches')
     def find_matches(self, resume_text, job_desc_text):
-        # Process texts
-        job_doc = self.nlp(job_desc_text.lower())
-        resume_doc = self.nlp(resume_text.lower())
+        index = self.build_index(job_desc_text)
+        resume_doc = parse(resume_text, self.model).doc
+        return self._matches(index, resume_doc)
+
+    @timed('keywords.find_matches_many')
+    def find_matches_many(self, resumes, job_desc_text, n_process=1):
+        """Match many resumes against one job description, compiling its index once."""
+        index = self.build_index(job_desc_text)
+        return [self._matches(index, parsed.doc)
+                for parsed in parse_many(resumes, self.model, n_process=n_process)]
+
+    def build_index(self, job_desc_text):
+        """Compile the keyword index for a job description; cached per job text."""
+        job = parse(job_desc_text, self.model)
+        key = (job.key, self.taxonomy_path)
+        index = job_index_cache.get(key)
+        if index is not None:
+            return index
+
+        job_doc = job.doc
+        index = KeywordIndex(self.nlp)
         
         # Extract important keywords from job description
-        job_keywords = [token.text for token in job_doc 
+        job_keywords = [token for token in job_doc 
                        if not token.is_stop and not token.is_punct and token.pos_ in ['NOUN', 'PROPN', 'ADJ']]
         
-        # Count frequency of important keywords
-        keyword_freq = Counter(job_keywords)
-        important_keywords = {word: count for word, count in keyword_freq.items() if count > 1}
+        # Keep keywords that are repeated, in order of first appearance
+        keyword_freq = Counter(token.text for token in job_keywords)
+        added = set()
+        for token in job_keywords:
+            if keyword_freq[token.text] > 1 and token.text not in added:
+                added.add(token.text)
+                index.add(token.text, [([token.text], [token.lemma_] if token.lemma_ else None)])
         
-        # Find matches in resume
-        resume_words = set([token.text for token in resume_doc 
-                          if not token.is_stop and not token.is_punct])
+        # Add every taxonomy skill the job mentions, including multi-word ones
+        taxonomy = get_taxonomy(self.taxonomy_path, self.model)
+        for skill in taxonomy.index().match(job_doc):
+            index.add(skill, taxonomy.patterns[skill])
+
+        job_index_cache.put(key, index)
+        return index
+
+    def _matches(self, index, resume_doc):
+        # One pass over the resume finds every keyword at once
+        found = set(index.match(resume_doc))
         
         matches = {
-            'found': [word for word in important_keywords if word in resume_words],
-            'missing': [word for word in important_keywords if word not in resume_words]
+            'found': [word for word in index.keywords if word in found],
+            'missing': [word for word in index.keywords if word not in found]
         }
         
         return matches
\ No newline at end of file
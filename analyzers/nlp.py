@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+from jobdone.metrics.spans import span
+
+
+@dataclass(frozen=True)
+class NLPProfile:
+    package: str
+    exclude: Tuple[str, ...] = ()
+    # Rule-based sentence boundaries, for profiles that drop the dependency parser
+    sentencizer: bool = False
+
+
+# Everywhere a `model` is accepted it may be a profile name or a spaCy package.
+# "fast" keeps only what the analyzers read: POS tags (tok2vec, tagger,
+# attribute_ruler), stop words and sentence boundaries. Without the
+# lemmatizer, taxonomy skills are matched on surface forms only.
+PROFILES = {
+    'accurate': NLPProfile('en_core_web_sm'),
+    'fast': NLPProfile('en_core_web_sm', exclude=('parser', 'ner', 'lemmatizer'), sentencizer=True),
+}
+
+# Per deployment: JOBDONE_NLP_PROFILE=fast; per call: model='fast'
+DEFAULT_MODEL = os.getenv("JOBDONE_NLP_PROFILE", 'accurate')
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(name=DEFAULT_MODEL):
+    """Return the process-wide spaCy pipeline for `name`, loading it on first use."""
+    nlp = _models.get(name)
+    if nlp is None:
+        with _models_lock:
+            nlp = _models.get(name)
+            if nlp is None:
+                with span('nlp.load_model'):
+                    nlp = _load(name)
+                _models[name] = nlp
+    return nlp
+
+
+def _load(name):
+    # Imported here so modules that only need parse() stay cheap to import
+    import spacy
+    profile = PROFILES.get(name)
+    if profile is None:
+        return spacy.load(name)
+    nlp = spacy.load(profile.package, exclude=list(profile.exclude))
+    if profile.sentencizer:
+        nlp.add_pipe('sentencizer', first=True)
+    return nlp
+
+
+# Analyzers built by init_worker, for the tasks a pool worker runs
+worker_analyzers = {}
+
+
+def init_worker(model=DEFAULT_MODEL):
+    """Process pool initializer: load the model, taxonomy and analyzers once per worker."""
+    # Imported here because both analyzers import this module
+    from jobdone.analyzers.keyword_index import get_taxonomy
+    from jobdone.analyzers.keyword_matcher import KeywordMatcher
+    from jobdone.analyzers.score_calculator import ScoreCalculator
+
+    load_model(model)
+    get_taxonomy(model=model)
+    worker_analyzers['score_calculator'] = ScoreCalculator(model)
+    worker_analyzers['keyword_matcher'] = KeywordMatcher(model)
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ParsedDocument:
+    """An input text together with the spaCy parse of its lowercased form."""
+
+    def __init__(self, text, doc, key):
+        self.text = text
+        self.doc = doc
+        self.key = key
+
+    @property
+    def lower(self):
+        return self.doc.text
+
+
+class DocumentCache:
+    """Thread-safe LRU keyed by (model, text hash); holds ParsedDocuments by default."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            parsed = self._items.get(key)
+            if parsed is not None:
+                self._items.move_to_end(key)
+            return parsed
+
+    def put(self, key, parsed):
+        with self._lock:
+            self._items[key] = parsed
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+document_cache = DocumentCache()
+
+
+def parse(text, model=DEFAULT_MODEL):
+    """Parse `text` once per process; repeated calls return the cached document."""
+    if isinstance(text, ParsedDocument):
+        return text
+
+    key = (model, text_hash(text))
+    parsed = document_cache.get(key)
+    if parsed is None:
+        nlp = load_model(model)
+        with span('nlp.parse'):
+            parsed = ParsedDocument(text, nlp(text.lower()), key)
+        document_cache.put(key, parsed)
+    return parsed
+
+
+def as_text(value):
+    """Accept either raw text or a ParsedDocument and return the raw text."""
+    if isinstance(value, ParsedDocument):
+        return value.text
+    return value
+
+
+def parse_many(texts, model=DEFAULT_MODEL, n_process=1, batch_size=64):
+    """Parse many texts with nlp.pipe, reusing and filling the document cache."""
+    texts = [as_text(text) for text in texts]
+    parsed = [document_cache.get((model, text_hash(text))) for text in texts]
+
+    pending = [i for i, doc in enumerate(parsed) if doc is None]
+    if pending:
+        with span('nlp.parse_many'):
+            docs = list(load_model(model).pipe((texts[i].lower() for i in pending),
+                                               n_process=n_process, batch_size=batch_size))
+        for i, doc in zip(pending, docs):
+            key = (model, text_hash(texts[i]))
+            parsed[i] = ParsedDocument(texts[i], doc, key)
+            document_cache.put(key, parsed[i])
+    return parsed
@@ -0,0 +1,78 @@
+import re
+
+# Words keep trailing + and # so "c++", "c#" and "5+" stay distinct tokens
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+[+#]*')
+
+EXACT_POINTS = 1.5
+PARTIAL_POINTS = 1.2
+
+def tokenize(text):
+    return tuple(TOKEN_PATTERN.findall(text.lower()))
+
+class RequirementMatcher:
+    """Resolves a set of requirements against resumes with word-boundary semantics.
+
+    The requirements are tokenized once; each resume is tokenized once into
+    a set of its words plus the positions of words that start a multi-word
+    phrase, after which every requirement is a set lookup or a check at a
+    few candidate positions. This replaces scanning the resume text once per
+    requirement and stops short requirements like "go" from matching inside
+    "good".
+    """
+
+    def __init__(self, requirements):
+        self.requirements = []
+        for req in requirements:
+            req_lower = req.lower()
+            words = req_lower.split()
+            # Partial credit only applies to multi-word requirements, and only
+            # words longer than three characters count towards it
+            scored_words = [(word, tokenize(word)) for word in words if len(word) > 3] if len(words) > 1 else []
+            self.requirements.append((req, tokenize(req_lower), len(words), scored_words))
+
+        phrases = [tokens for _, tokens, _, _ in self.requirements]
+        phrases += [tokens for _, _, _, scored in self.requirements for _, tokens in scored]
+        self.phrase_starts = {tokens[0] for tokens in phrases if len(tokens) > 1}
+
+    def index(self, resume_text):
+        return _ResumeIndex(tokenize(resume_text), self.phrase_starts)
+
+    def match(self, resume_text):
+        """Per-requirement match report for one resume.
+
+        Each entry has the requirement, its status ('exact', 'partial' or
+        'missing'), the points it earns and the requirement words found.
+        """
+        resume = self.index(resume_text)
+        report = []
+        for req, tokens, word_count, scored_words in self.requirements:
+            if tokens and tokens in resume:
+                report.append({'requirement': req, 'status': 'exact',
+                               'points': EXACT_POINTS, 'matched_words': req.lower().split()})
+                continue
+
+            matched_words = [word for word, word_tokens in scored_words if word_tokens and word_tokens in resume]
+            if matched_words:
+                report.append({'requirement': req, 'status': 'partial',
+                               'points': (len(matched_words) / word_count) * PARTIAL_POINTS,
+                               'matched_words': matched_words})
+            else:
+                report.append({'requirement': req, 'status': 'missing',
+                               'points': 0, 'matched_words': []})
+        return report
+
+
+class _ResumeIndex:
+    def __init__(self, tokens, phrase_starts):
+        self.tokens = tokens
+        self.words = set(tokens)
+        self.starts = {}
+        for i, token in enumerate(tokens):
+            if token in phrase_starts:
+                self.starts.setdefault(token, []).append(i)
+
+    def __contains__(self, phrase):
+        if len(phrase) == 1:
+            return phrase[0] in self.words
+        n = len(phrase)
+        return any(self.tokens[i:i + n] == phrase for i in self.starts.get(phrase[0], ()))
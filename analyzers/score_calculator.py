@@ -1,11 +1,16 @@
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+import numpy as np
+import math
 import re
 from collections import Counter
+from jobdone.analyzers.nlp import DEFAULT_MODEL, as_text, load_model, parse
+from jobdone.analyzers.requirement_matcher import RequirementMatcher
+from jobdone.metrics.spans import span, timed
 
 class ScoreCalculator:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, model=DEFAULT_MODEL):
+        self.model = model
+        self.nlp = load_model(model)
         
         # Keywords that indicate important requirements
         self.importance_markers = [
@@ -21,25 +26,25 @@ class ScoreCalculator:
             r'[A-Za-z0-9#\+\+]+(?:\.[A-Za-z0-9]+)*',   # Programming languages and tools
         ]
 
+    @timed('score.requirements')
     def extract_key_requirements(self, job_desc):
-        doc = self.nlp(job_desc.lower())
+        doc = parse(job_desc, self.model).doc
         
         # Find sentences with importance markers
         important_sentences = []
         for sent in doc.sents:
-            if any(marker in sent.text.lower() for marker in self.importance_markers):
-                important_sentences.append(sent.text)
+            if any(marker in sent.text for marker in self.importance_markers):
+                important_sentences.append(sent)
         
         # Extract key terms from important sentences
         key_terms = []
         for sent in important_sentences:
             # Extract years of experience
-            experience_matches = re.findall(r'\d+\+?\s*(?:years?|yrs?)', sent)
+            experience_matches = re.findall(r'\d+\+?\s*(?:years?|yrs?)', sent.text)
             key_terms.extend(experience_matches)
             
-            # Extract other important terms
-            doc_sent = self.nlp(sent)
-            for token in doc_sent:
+            # Extract other important terms from the already parsed sentence span
+            for token in sent:
                 if (token.pos_ in ['NOUN', 'PROPN'] and 
                     len(token.text) > 2 and 
                     not token.is_stop):
@@ -47,29 +52,32 @@ class ScoreCalculator:
         
         return list(set(key_terms))
 
-    def calculate_score(self, resume_text, job_desc_text):
-        # Extract key requirements
-        key_requirements = self.extract_key_requirements(job_desc_text)
+    def calculate_score(self, resume_text, job_desc_text, key_requirements=None):
+        return self.score_with_report(resume_text, job_desc_text, key_requirements)[0]
+
+    @timed('score.calculate')
+    def score_with_report(self, resume_text, job_desc_text, key_requirements=None):
+        """calculate_score's score and the per-requirement report it is built from.
+
+        Requirements are extracted and matched once for both, so callers that
+        show the report should use this rather than calling requirement_report
+        as well.
+        """
+        # Extract key requirements unless the caller already has them (e.g. from a JobIndex)
+        if key_requirements is None:
+            key_requirements = self.extract_key_requirements(job_desc_text)
+        resume_text = as_text(resume_text)
+        job_desc_text = as_text(job_desc_text)
         
         # Calculate base score from key requirements
-        resume_text_lower = resume_text.lower()
         matches = 0
         total_reqs = len(key_requirements)
         
-        # Weighted scoring for requirements
-        for req in key_requirements:
-            req_lower = req.lower()
-            # Give full point for exact matches
-            if req_lower in resume_text_lower:
-                matches += 1.5  # Increased bonus points for exact matches
-            # Give partial points for partial matches
-            else:
-                # Split requirement into words and check each
-                req_words = req_lower.split()
-                if len(req_words) > 1:  # Only for multi-word requirements
-                    matched_words = sum(1 for word in req_words 
-                                     if word in resume_text_lower and len(word) > 3)
-                    matches += (matched_words / len(req_words)) * 1.2  # Increased partial match points
+        # Weighted scoring for requirements: full points for exact matches,
+        # partial points for multi-word requirements with some words present
+        report = RequirementMatcher(key_requirements).match(resume_text)
+        for item in report:
+            matches += item['points']
         
         # Base score from key requirements (80% of total score)
         base_score = (matches / total_reqs) * 8.0 if total_reqs > 0 else 0
@@ -77,8 +85,9 @@ class ScoreCalculator:
         # Calculate similarity score for overall content (20% of total score)
         vectorizer = TfidfVectorizer(stop_words='english')
         try:
-            tfidf_matrix = vectorizer.fit_transform([resume_text, job_desc_text])
-            similarity_score = ((tfidf_matrix * tfidf_matrix.T).A[0][1]) * 2.0
+            with span('score.tfidf'):
+                tfidf_matrix = vectorizer.fit_transform([resume_text, job_desc_text])
+                similarity_score = tfidf_matrix[0].multiply(tfidf_matrix[1]).sum() * 2.0
             # Boost similarity score if it's above average
             if similarity_score > 1.0:  # Further lowered threshold
                 similarity_score *= 1.4  # Increased boost
@@ -102,4 +111,91 @@ class ScoreCalculator:
         final_score = min(max(final_score, 0), 10)
         
         # Round to one decimal place
-        return round(final_score, 1)
\ No newline at end of file
+        return round(final_score, 1), report
+
+    def requirement_report(self, resume_text, job_desc_text):
+        """Per-requirement match details behind calculate_score's requirement score."""
+        key_requirements = self.extract_key_requirements(job_desc_text)
+        return RequirementMatcher(key_requirements).match(as_text(resume_text))
+
+    @timed('score.score_many')
+    def score_many(self, job_desc_text, resumes):
+        """Score many resumes against one job description.
+
+        Gives the same results as calling calculate_score for every resume,
+        but extracts requirements once, builds the term counts for the whole
+        corpus in one pass and computes the scores as array operations.
+        """
+        resumes = [as_text(resume) for resume in resumes]
+        if not resumes:
+            return []
+
+        key_requirements = self.extract_key_requirements(job_desc_text)
+        job_desc_text = as_text(job_desc_text)
+        base_scores = self._requirement_scores(key_requirements, resumes)
+        similarity_scores = self._similarity_scores(job_desc_text, resumes) * 2.0
+        similarity_scores = np.where(similarity_scores > 1.0, similarity_scores * 1.4, similarity_scores)
+
+        final_scores = base_scores + similarity_scores
+        final_scores = np.where(final_scores > 4, final_scores * 1.3,
+                                np.where(final_scores > 2, final_scores * 1.25, final_scores))
+        final_scores = np.where(final_scores > 0, np.maximum(final_scores, 7.0), final_scores)
+        final_scores = np.clip(final_scores, 0, 10)
+
+        return [round(float(score), 1) for score in final_scores]
+
+    def _requirement_scores(self, key_requirements, resumes):
+        """Vectorized form of the weighted requirement matching in calculate_score."""
+        total_reqs = len(key_requirements)
+        if total_reqs == 0:
+            return np.zeros(len(resumes))
+
+        # Requirements are compiled once; each resume is indexed once
+        matcher = RequirementMatcher(key_requirements)
+        points = np.array([[item['points'] for item in matcher.match(resume)] for resume in resumes],
+                          dtype=np.float64)
+
+        # Accumulate in requirement order so sums match calculate_score exactly
+        matches = np.zeros(len(resumes))
+        for k in range(total_reqs):
+            matches += points[:, k]
+
+        return (matches / total_reqs) * 8.0
+
+    @staticmethod
+    def _similarity_scores(job_desc_text, resumes):
+        """Cosine similarity of each (resume, job description) TF-IDF pair.
+
+        calculate_score fits a TfidfVectorizer on just the two documents, so
+        every term has idf 1 when it occurs in both and 1 + ln(3/2) when it
+        occurs in only one. That lets every pair be computed from corpus-wide
+        term counts with sparse matrix-vector products.
+        """
+        vectorizer = CountVectorizer(stop_words='english')
+        try:
+            counts = vectorizer.fit_transform([job_desc_text] + resumes).tocsr().astype(np.float64)
+        except ValueError:
+            # Empty vocabulary: nothing but stop words anywhere
+            return np.zeros(len(resumes))
+
+        job_counts = counts[0].toarray().ravel()
+        resume_counts = counts[1:]
+
+        unique_idf = 1.0 + math.log(1.5)
+        unique_idf_sq = unique_idf * unique_idf
+        in_job = (job_counts > 0).astype(np.float64)
+        resume_sq = resume_counts.multiply(resume_counts).tocsr()
+        in_resume = resume_counts.copy()
+        in_resume.data = np.ones_like(in_resume.data)
+
+        dot = resume_counts @ job_counts
+        resume_norm_sq = (unique_idf_sq * np.asarray(resume_sq.sum(axis=1)).ravel()
+                          - (unique_idf_sq - 1.0) * (resume_sq @ in_job))
+        job_norm_sq = (unique_idf_sq * float(job_counts @ job_counts)
+                       - (unique_idf_sq - 1.0) * (in_resume @ (job_counts * job_counts)))
+
+        norms = np.sqrt(resume_norm_sq * job_norm_sq)
+        similarity = np.zeros(len(resumes))
+        nonzero = norms > 0
+        similarity[nonzero] = dot[nonzero] / norms[nonzero]
+        return similarity
\ No newline at end of file
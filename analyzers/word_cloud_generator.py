@@ -1,22 +1,59 @@
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+from collections import Counter, OrderedDict
+from jobdone.analyzers.nlp import DEFAULT_MODEL, parse, text_hash
+from jobdone.metrics.spans import timed
 import io
-import base64
+import threading
+
+# Rendered PNGs shared by every generator in the process, keyed by content hash
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+MAX_CACHED_IMAGES = 64
 
 class WordCloudGenerator:
-    def generate(self, text):
-        # Create and generate a word cloud image
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-        
-        # Create the image
-        plt.figure(figsize=(10, 5))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
+    def __init__(self, width=800, height=400, background_color='white', skill_weight=3, model=DEFAULT_MODEL):
+        self.width = width
+        self.height = height
+        self.background_color = background_color
+        # Extra frequency given to each occurrence of an extracted skill
+        self.skill_weight = skill_weight
+        self.model = model
+
+    def generate(self, text, skills=None):
+        skills = sorted(skill.lower() for skill in (skills or []))
+        parsed = parse(text, self.model)
+        key = text_hash(f"{parsed.key}|{skills}|{self.width}x{self.height}|{self.background_color}|{self.skill_weight}")
+
+        with _image_cache_lock:
+            png = _image_cache.get(key)
+            if png is not None:
+                _image_cache.move_to_end(key)
         
-        # Save it to a temporary buffer.
+        if png is None:
+            png = self._render(self.word_frequencies(parsed, skills))
+            with _image_cache_lock:
+                _image_cache[key] = png
+                while len(_image_cache) > MAX_CACHED_IMAGES:
+                    _image_cache.popitem(last=False)
+
+        # Hand out a fresh buffer so callers never share a read position
+        return io.BytesIO(png)
+
+    def word_frequencies(self, text, skills=None):
+        """Word frequencies from the parsed text, with extracted skills weighted up."""
+        doc = parse(text, self.model).doc
+        frequencies = Counter(token.text for token in doc
+                              if not token.is_stop and not token.is_punct and not token.is_space
+                              and len(token.text) > 1)
+        for skill in skills or []:
+            frequencies[skill.lower()] += self.skill_weight
+        return frequencies
+
+    @timed('wordcloud.render')
+    def _render(self, frequencies):
+        # Draw straight to a PIL image and encode it, without a pyplot figure
+        wordcloud = WordCloud(width=self.width, height=self.height, background_color=self.background_color)
+        wordcloud.generate_from_frequencies(frequencies)
         buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-        
-        return buf
\ No newline at end of file
+        wordcloud.to_image().save(buf, format='png')
+        return buf.getvalue()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Memoized analysis stage for the Streamlit app.
+
+Streamlit reruns the whole script on every widget interaction, so the
+analysis result is cached per (resume hash, job description hash) pair with
+st.cache_data, and the analyzers, which hold loaded models, are cached once
+per process with st.cache_resource. A rerun with unchanged inputs is a cache
+lookup. On a miss both documents are parsed once and the independent stages
+run concurrently: scoring on the session's own script thread, keyword
+matching and job facts on a thread pool.
+
+The pool is shared by every session in the process and sized by
+JOBDONE_ANALYSIS_WORKERS. Each analysis uses two of its threads, so beyond
+half that many concurrent analyses the pooled stages queue behind other
+sessions'. While a request is being profiled (metrics.profile) every stage
+runs on the script thread, since cProfile only sees the thread it runs on.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import streamlit as st
+from jobdone.analyzers.job_facts import JobFacts, extract_job_facts
+from jobdone.analyzers.nlp import text_hash
+from jobdone.metrics import spans as metrics
+
+MAX_CACHED_ANALYSES = 64
+ANALYSIS_WORKERS = int(os.getenv("JOBDONE_ANALYSIS_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="jobdone-analysis")
+
+
+@dataclass(frozen=True)
+class AnalysisResult:
+    score: float
+    keywords: Dict[str, List[str]]
+    requirement_report: List[dict]
+    job_facts: JobFacts
+    word_cloud: Optional[bytes]
+
+
+@st.cache_resource(show_spinner=False)
+def get_score_calculator():
+    from jobdone.analyzers.score_calculator import ScoreCalculator
+    return ScoreCalculator()
+
+
+@st.cache_resource(show_spinner=False)
+def get_keyword_matcher():
+    from jobdone.analyzers.keyword_matcher import KeywordMatcher
+    return KeywordMatcher()
+
+
+@st.cache_resource(show_spinner=False)
+def get_word_cloud_generator():
+    from jobdone.analyzers.word_cloud_generator import WordCloudGenerator
+    return WordCloudGenerator()
+
+
+def analyze(resume_text, job_desc_text):
+    """Run (or fetch) the full analysis for a resume and job description."""
+    return _analyze(text_hash(resume_text), text_hash(job_desc_text), resume_text, job_desc_text)
+
+
+# Arguments starting with an underscore are not hashed by st.cache_data, so
+# the key is the pair of content hashes rather than the full texts
+@st.cache_data(max_entries=MAX_CACHED_ANALYSES, show_spinner="Analyzing...")
+def _analyze(resume_key, job_desc_key, _resume_text, _job_desc_text):
+    from jobdone.analyzers.nlp import parse
+
+    score_calculator = get_score_calculator()
+    keyword_matcher = get_keyword_matcher()
+    word_cloud = get_word_cloud_generator()
+
+    # Parse each input once up front; every stage below reads these documents
+    resume_doc = parse(_resume_text)
+    job_desc_doc = parse(_job_desc_text)
+
+    if metrics.is_profiling():
+        # cProfile only sees this thread, so nothing goes to the pool
+        keywords = keyword_matcher.find_matches(resume_doc, job_desc_doc)
+        facts, cloud = _job_facts_and_cloud(word_cloud, _job_desc_text, job_desc_doc)
+        match_score, requirement_report = score_calculator.score_with_report(resume_doc, job_desc_doc)
+    else:
+        keywords_future = _executor.submit(keyword_matcher.find_matches, resume_doc, job_desc_doc)
+        job_facts_future = _executor.submit(_job_facts_and_cloud, word_cloud, _job_desc_text, job_desc_doc)
+        match_score, requirement_report = score_calculator.score_with_report(resume_doc, job_desc_doc)
+        keywords = keywords_future.result()
+        facts, cloud = job_facts_future.result()
+
+    return AnalysisResult(
+        score=match_score,
+        keywords=keywords,
+        requirement_report=requirement_report,
+        job_facts=facts,
+        word_cloud=cloud,
+    )
+
+
+def _job_facts_and_cloud(word_cloud, job_desc_text, job_desc_doc):
+    facts = extract_job_facts(job_desc_text)
+    # Extracted skills get a higher weight in the word cloud
+    image = word_cloud.generate(job_desc_doc, skills=list(facts.skills))
+    return facts, image.getvalue()
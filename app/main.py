@@ -1,12 +1,46 @@
+import os
+import threading
+import weakref
 import streamlit as st
-from jobdone.file_processor.pdf_reader import PDFReader
-from jobdone.file_processor.docx_reader import DocxReader
-from jobdone.file_processor.text_reader import TextReader
-from jobdone.analyzers.score_calculator import ScoreCalculator
-from jobdone.analyzers.word_cloud_generator import WordCloudGenerator
-from jobdone.analyzers.keyword_matcher import KeywordMatcher
-from jobdone.resume_generator.ai_generator import ResumeGenerator
-import re
+from jobdone.file_processor.registry import extract
+from jobdone.metrics import spans as metrics
+
+# Analyzers and the resume generator pull in spaCy, scikit-learn, wordcloud
+# and groq, so they are imported where they are first used rather than here.
+
+# ?debug=1 only works where the deployment allows it: metrics are process-wide,
+# so any visitor turning them on slows every session
+DEBUG_PANEL_ENABLED = os.getenv("JOBDONE_DEBUG_PANEL", "").lower() in ('1', 'true')
+
+_debug_sessions = 0
+_debug_lock = threading.Lock()
+# Metrics already on (JOBDONE_METRICS) are left on when debug sessions end
+_metrics_preenabled = metrics.is_enabled()
+
+
+class _DebugSession:
+    """Held in a debug session's state; when the session is dropped, so is its claim on metrics."""
+
+
+def _start_debug_metrics(memory):
+    global _debug_sessions
+    with _debug_lock:
+        if memory or not metrics.is_enabled():
+            metrics.enable(memory=memory)
+        if '_debug_session' in st.session_state:
+            return
+        _debug_sessions += 1
+    token = st.session_state['_debug_session'] = _DebugSession()
+    weakref.finalize(token, _stop_debug_metrics)
+
+
+def _stop_debug_metrics():
+    global _debug_sessions
+    with _debug_lock:
+        _debug_sessions -= 1
+        # Collection stops with the last debug session
+        if _debug_sessions == 0 and not _metrics_preenabled:
+            metrics.disable()
 
 def set_page_config():
     st.set_page_config(
@@ -46,12 +80,25 @@ class ResumeBuilderApp:
         # Update to use st.query_params instead of experimental_get_query_params
         page = st.query_params.get("page", "home")
         
-        if page == "services":
-            self.show_services_page()
-        elif page == "about":
-            self.show_about_page()
+        # With JOBDONE_DEBUG_PANEL=1, ?debug=1 turns on stage metrics (and
+        # ?memory=1 peak allocation tracking) until the session ends or drops it
+        debug = DEBUG_PANEL_ENABLED and st.query_params.get("debug") == "1"
+        if debug:
+            _start_debug_metrics(memory=st.query_params.get("memory") == "1")
         else:
-            self.show_main_page()
+            st.session_state.pop('_debug_session', None)
+        profiling = debug and st.session_state.get("profile_requests", False)
+        
+        with metrics.profile(enabled=profiling) as profile_result:
+            if page == "services":
+                self.show_services_page()
+            elif page == "about":
+                self.show_about_page()
+            else:
+                self.show_main_page()
+        
+        if debug:
+            self.show_debug_panel(profile_result)
 
     def show_services_page(self):
         st.markdown('<h1 class="main-title">Our Services</h1>', unsafe_allow_html=True)
@@ -126,80 +173,52 @@ class ResumeBuilderApp:
             if st.session_state.analysis_done:
                 st.markdown("---")
                 
+                from jobdone.app.analysis import analyze
+                
+                # Memoized on the input hashes: reruns without input changes skip the analysis
+                analysis = analyze(resume_text, job_desc_text)
+                
                 # Analysis results in columns
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    score_calculator = ScoreCalculator()
-                    match_score = score_calculator.calculate_score(resume_text, job_desc_text)
                     st.markdown(f"""
                         <div style='padding: 0.5rem;'>
                             <h2 style='color: #0066cc; margin-bottom: 0.5rem; font-size: 1.2rem;'>Match Score</h2>
-                            <h1 style='font-size: 2.5rem; font-weight: bold; color: #1f1f1f;'>{match_score}/10</h1>
+                            <h1 style='font-size: 2.5rem; font-weight: bold; color: #1f1f1f;'>{analysis.score}/10</h1>
                         </div>
                     """, unsafe_allow_html=True)
                     
-                    keyword_matcher = KeywordMatcher()
-                    matching_keywords = keyword_matcher.find_matches(resume_text, job_desc_text)
                     st.write("#### Matching Keywords")
-                    st.write(", ".join(matching_keywords['found']))
+                    st.write(", ".join(analysis.keywords['found']))
+                    
+                    # Show how each extracted requirement was matched
+                    status_icons = {'exact': '✅', 'partial': '🟡', 'missing': '❌'}
+                    with st.expander("Requirement Match Details"):
+                        for item in analysis.requirement_report:
+                            st.write(f"{status_icons[item['status']]} {item['requirement']}")
                 
                 with col2:
-                    word_cloud = WordCloudGenerator()
-                    # Extract important information before generating word cloud
-                    important_patterns = {
-                        'years_exp': r'\b(\d+[\+]?\s*-?\s*\d*)\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)\b',
-                        'location': r'\b(?:in|at|from)?\s*((?:remote|hybrid|onsite|on-site|in-office))\b|\b([A-Z][a-zA-Z\s]+(?:,\s*[A-Z]{2})?)\b',
-                        'skills': r'\b(?:Python|Java|JavaScript|React|AWS|SQL|Docker|Kubernetes|Azure|Git|REST|API|ML|AI|Node\.js|TypeScript|Angular|Vue\.js|PHP|C\+\+|Swift|Kotlin|Ruby|Go|Rust|HTML|CSS|MongoDB|PostgreSQL|MySQL)\b',
-                        'education': r'\b(?:Bachelor\'?s?|Master\'?s?|PhD|BS|MS|BA|MBA|MD)\b',
-                        'salary': r'\$\s*(?:\d{1,3},)*\d{1,3}(?:k|K)?\s*(?:-\s*\$\s*(?:\d{1,3},)*\d{1,3}(?:k|K)?)?(?:\s*\/\s*(?:year|yr|month|mo|annual|annually))?'
-                    }
+                    job_facts = analysis.job_facts
                     
                     # Create columns for important information
                     st.write("#### Key Job Requirements")
                     info_col1, info_col2 = st.columns(2)
                     
                     with info_col1:
-                        # Extract and display experience
-                        exp_matches = re.findall(important_patterns['years_exp'], job_desc_text, re.IGNORECASE)
-                        if exp_matches:
-                            st.write("🎯 **Experience:** ", exp_matches[0], "years")
+                        if job_facts.experience:
+                            st.write("🎯 **Experience:** ", job_facts.experience, "years")
                         
-                        # Improved location detection
-                        location_pattern = r'\b(?:remote|hybrid|on-site|onsite)\b|\b[A-Z][a-zA-Z\s]+(?:,\s*[A-Z]{2})?\b|\b[A-Z]{2},\s*USA\b|\b(?:United States|Canada|UK|Australia|New Zealand|India)\b'
-                        loc_matches = re.findall(location_pattern, job_desc_text)
-                        
-                        location = "Unknown"
-                        if loc_matches:
-                            # Prioritize 'remote' if it exists
-                            if any(word.lower() == 'remote' for word in loc_matches):
-                                location = "Remote"
-                            else:
-                                # Take the first location match that's not a work arrangement
-                                for match in loc_matches:
-                                    if match.lower() not in ['hybrid', 'on-site', 'onsite']:
-                                        location = match
-                                        break
-                        
-                        st.write("📍 **Location:** ", location)
+                        st.write("📍 **Location:** ", job_facts.location)
                     
                     with info_col2:
-                        # Extract and display salary if available
-                        salary_matches = re.findall(important_patterns['salary'], job_desc_text)
-                        if salary_matches:
-                            st.write("💰 **Salary:** ", salary_matches[0])
+                        if job_facts.salary:
+                            st.write("💰 **Salary:** ", job_facts.salary)
                         
-                        # Extract and display required education
-                        edu_matches = re.findall(important_patterns['education'], job_desc_text)
-                        if edu_matches:
-                            st.write("🎓 **Education:** ", edu_matches[0])
+                        if job_facts.education:
+                            st.write("🎓 **Education:** ", job_facts.education)
                     
-                    # Extract skills and give them higher weight in word cloud
-                    skills = re.findall(important_patterns['skills'], job_desc_text)
-                    
-                    # Generate word cloud with higher weights for important terms
-                    word_cloud_image = word_cloud.generate(job_desc_text)
-                    st.image(word_cloud_image, caption="Important Keywords in Job Description")
+                    st.image(analysis.word_cloud, caption="Important Keywords in Job Description")
                 
                 # Add space before generate resume button
                 st.markdown("<div style='margin-top: 2rem;'></div>", unsafe_allow_html=True)
@@ -207,25 +226,68 @@ class ResumeBuilderApp:
                 # Center the generate resume button
                 col1, col2, col3 = st.columns([3, 2, 3])
                 with col2:
-                    if st.button("Generate Optimized Resume", use_container_width=True):
-                        with st.spinner("Generating optimized resume..."):
-                            resume_gen = ResumeGenerator()
-                            optimized_resume = resume_gen.generate(resume_text, job_desc_text)
-                            st.download_button(
-                                "📥 Download Optimized Resume",
-                                optimized_resume,
-                                file_name="optimized_resume.docx",
-                                use_container_width=True
+                    generate_clicked = st.button("Generate Optimized Resume", use_container_width=True)
+                
+                if generate_clicked:
+                    from jobdone.resume_generator.ai_generator import ResumeGenerator
+                    resume_gen = ResumeGenerator()
+                    
+                    # Render the optimized resume progressively as tokens arrive
+                    with st.expander("Optimized Resume", expanded=True):
+                        try:
+                            optimized_content = st.write_stream(
+                                resume_gen.stream_optimized_content(resume_text, job_desc_text)
                             )
+                        except Exception as e:
+                            st.warning(f"AI generation failed, using your original resume: {str(e)}")
+                            optimized_content = resume_text
+                    
+                    optimized_resume = resume_gen.create_document(optimized_content.strip())
+                    col1, col2, col3 = st.columns([3, 2, 3])
+                    with col2:
+                        st.download_button(
+                            "📥 Download Optimized Resume",
+                            optimized_resume,
+                            file_name="optimized_resume.docx",
+                            use_container_width=True
+                        )
+
+    def show_debug_panel(self, profile_result):
+        with st.expander("⏱️ Performance Metrics"):
+            st.checkbox("Profile each request with cProfile", key="profile_requests")
+            
+            snapshot = metrics.registry.snapshot()
+            if snapshot:
+                st.table([
+                    {
+                        'stage': stage,
+                        'calls': stats['calls'],
+                        'errors': stats['errors'],
+                        'mean ms': round(stats['mean_seconds'] * 1000, 2),
+                        'max ms': round(stats['max_seconds'] * 1000, 2),
+                        'peak KiB': round(stats['peak_bytes'] / 1024, 1),
+                    }
+                    for stage, stats in snapshot.items()
+                ])
+            else:
+                st.write("No stages recorded yet.")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Reset metrics"):
+                    metrics.registry.reset()
+            with col2:
+                st.download_button("Download JSON", metrics.registry.to_json(), file_name="jobdone_metrics.json")
+            
+            st.code(metrics.registry.to_prometheus(), language="text")
+            
+            if profile_result['stats']:
+                st.write("#### cProfile (this request)")
+                st.code(profile_result['stats'], language="text")
 
     def _process_file(self, file):
-        file_ext = file.name.split('.')[-1].lower()
-        if file_ext == 'pdf':
-            return PDFReader().read(file)
-        elif file_ext == 'docx':
-            return DocxReader().read(file)
-        else:
-            return TextReader().read(file)
+        # Format is sniffed from the content; reruns with the same upload hit the extraction cache
+        return extract(file)
 
 if __name__ == "__main__":
     app = ResumeBuilderApp()
@@ -0,0 +1,146 @@
+"""Headless batch screening driven by a JSONL job file.
+
+Each input line names a resume and a job description file:
+
+    {"id": "cand-17", "resume": "resumes/17.pdf", "job_description": "jobs/backend.txt"}
+
+Requests are extracted, scored and keyword-matched on a process pool whose
+workers load the NLP model once at start-up, and results are streamed back
+as JSONL in completion order. Only a bounded number of requests are in flight
+at a time, so memory does not grow with the size of the job file. When
+resuming, ids the output file already has a successful result for are
+skipped; failed ones are run again and their new result appended.
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from jobdone.analyzers.nlp import DEFAULT_MODEL, init_worker, worker_analyzers
+
+
+def _read_text(path):
+    from jobdone.file_processor.registry import extract
+    with open(path, 'rb') as f:
+        return extract(f)
+
+
+def process_request(request):
+    """Extract, score and match one request; errors are reported, not raised."""
+    result = {
+        'id': request['id'],
+        'resume': request.get('resume'),
+        'job_description': request.get('job_description'),
+    }
+    start = time.perf_counter()
+    try:
+        resume_text = _read_text(request['resume'])
+        job_desc_text = _read_text(request['job_description'])
+        result['score'] = worker_analyzers['score_calculator'].calculate_score(resume_text, job_desc_text)
+        result['keywords'] = worker_analyzers['keyword_matcher'].find_matches(resume_text, job_desc_text)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {str(e)}"
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def read_requests(path):
+    """Yield requests from a JSONL file, giving each an id (its line number by default)."""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                yield {'id': line_number, 'error': f"Invalid JSON: {str(e)}"}
+                continue
+            if not isinstance(request, dict):
+                yield {'id': line_number, 'error': f"Expected a JSON object, got {type(request).__name__}"}
+                continue
+            request.setdefault('id', line_number)
+            # Relative paths are resolved against the job file's directory
+            for field in ('resume', 'job_description'):
+                if isinstance(request.get(field), str):
+                    request[field] = os.path.join(base_dir, request[field])
+            yield request
+
+
+def completed_ids(output_path):
+    """Ids a previous run's output has a successful result for, for resuming.
+
+    Ids whose result is an error are left out so they are retried. A
+    partially written last line from an interrupted run is cut off so the
+    resumed run appends after the last complete result.
+    """
+    done = set()
+    if not output_path or output_path == '-' or not os.path.exists(output_path):
+        return done
+    complete_bytes = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            complete_bytes += len(line)
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(result, dict) and 'id' in result and 'error' not in result:
+                done.add(result['id'])
+    with open(output_path, 'r+b') as f:
+        f.truncate(complete_bytes)
+    return done
+
+
+def run_batch(input_path, output_path='-', workers=None, resume=False, max_in_flight=None,
+              model=None, progress=sys.stderr):
+    """Run every request in `input_path`, streaming JSONL results to `output_path`."""
+    model = model or DEFAULT_MODEL
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    skip = completed_ids(output_path) if resume else set()
+
+    out = sys.stdout if output_path == '-' else open(output_path, 'a' if resume else 'w', encoding='utf-8')
+    counts = {'done': 0, 'errors': 0, 'skipped': 0}
+    start = time.perf_counter()
+
+    def write(result):
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+        counts['done'] += 1
+        counts['errors'] += 'error' in result
+        if progress and counts['done'] % 100 == 0:
+            rate = counts['done'] / (time.perf_counter() - start)
+            print(f"{counts['done']} done, {counts['errors']} errors, {rate:.1f}/s", file=progress)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(model,)) as executor:
+            pending = set()
+            for request in read_requests(input_path):
+                if request['id'] in skip:
+                    counts['skipped'] += 1
+                    continue
+                if 'error' in request:
+                    write(request)
+                    continue
+
+                # Back-pressure: never hold more than max_in_flight requests at once
+                if len(pending) >= max_in_flight:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result())
+                pending.add(executor.submit(process_request, request))
+
+            for future in wait(pending).done:
+                write(future.result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if progress:
+        print(f"Finished: {counts['done']} processed, {counts['errors']} errors, "
+              f"{counts['skipped']} skipped in {time.perf_counter() - start:.1f}s", file=progress)
+    return counts
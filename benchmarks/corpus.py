@@ -0,0 +1,121 @@
+"""Synthetic resumes and job postings of controlled size, as TXT, PDF and DOCX.
+
+Everything is generated from a seed, so runs on different machines and at
+different times benchmark exactly the same inputs.
+"""
+import io
+import random
+import textwrap
+
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'SQL', 'AWS', 'Azure', 'Docker',
+          'Kubernetes', 'React', 'Django', 'Flask', 'PostgreSQL', 'MongoDB', 'Terraform',
+          'machine learning', 'data pipelines', 'REST APIs', 'CI/CD', 'microservices']
+VERBS = ['Built', 'Designed', 'Led', 'Improved', 'Delivered', 'Migrated', 'Automated',
+         'Scaled', 'Mentored', 'Launched']
+NOUNS = ['services', 'platform', 'dashboards', 'pipelines', 'systems', 'features',
+         'infrastructure', 'tooling', 'APIs', 'reports', 'customers', 'teams']
+FILLER = ['for', 'with', 'across', 'using', 'to support', 'serving', 'reducing latency for',
+          'improving reliability of', 'in collaboration with']
+MARKERS = ['Required', 'Must have', 'Experience with', 'Strong knowledge of',
+           'Proficiency in', 'Background in', 'Ability to work with']
+LOCATIONS = ['Austin, TX', 'Seattle, WA', 'New York, NY', 'Remote', 'Denver, CO']
+
+
+def _sentence(rng, n_words):
+    words = [rng.choice(VERBS)]
+    while len(words) < n_words:
+        words.append(rng.choice(NOUNS if len(words) % 3 else FILLER))
+        if rng.random() < 0.3:
+            words.append(rng.choice(SKILLS))
+    return ' '.join(words[:n_words]) + '.'
+
+
+def make_resume(n_words, seed=0):
+    """A resume of roughly `n_words` words with the usual sections."""
+    rng = random.Random(seed)
+    parts = ["Summary", _sentence(rng, 30), "Experience"]
+    words = 40
+    while words < n_words - 40:
+        parts.append(f"- {_sentence(rng, 18)}")
+        words += 19
+    parts += ["Skills", ', '.join(rng.sample(SKILLS, 10)),
+              "Education", "Bachelor of Science in Computer Science"]
+    return '\n'.join(parts)
+
+
+def make_job_description(n_words, seed=0):
+    """A job posting of roughly `n_words` words with requirement sentences."""
+    rng = random.Random(seed + 1_000_003)
+    parts = [f"Senior Software Engineer - {rng.choice(LOCATIONS)}",
+             f"Salary ${rng.randint(90, 160)},000 - ${rng.randint(161, 220)},000/year"]
+    words = 12
+    while words < n_words:
+        if rng.random() < 0.5:
+            sentence = (f"{rng.choice(MARKERS)} {rng.choice(SKILLS)} and {rng.choice(SKILLS)}; "
+                        f"{rng.randint(2, 8)}+ years of experience required.")
+        else:
+            sentence = _sentence(rng, 16)
+        parts.append(sentence)
+        words += len(sentence.split())
+    parts.append("Bachelor's degree in Computer Science or equivalent experience.")
+    return '\n'.join(parts)
+
+
+def to_txt(text):
+    return text.encode('utf-8')
+
+
+def to_docx(text):
+    from docx import Document
+    doc = Document()
+    for line in text.split('\n'):
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def to_pdf(text, lines_per_page=50, width=90):
+    """A minimal multi-page PDF with the text in Helvetica; no extra dependencies."""
+    lines = []
+    for line in text.split('\n'):
+        lines.extend(textwrap.wrap(line, width) or [''])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    def escape(line):
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    for page in pages:
+        stream = 'BT /F1 10 Tf 14 TL 50 800 Td\n' + ''.join(f'({escape(line)}) Tj T*\n' for line in page) + 'ET'
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects.append((content_id, f'<< /Length {len(stream.encode("latin-1", "replace"))} >>\n'
+                                    f'stream\n{stream}\nendstream'))
+        objects.append((page_id, f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+                                 f'/Contents {content_id} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>'))
+        page_ids.append(page_id)
+
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects = [(1, '<< /Type /Catalog /Pages 2 0 R >>'),
+               (2, f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'),
+               (3, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')] + objects
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = {}
+    for obj_id, body in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(f'{obj_id} 0 obj\n{body}\nendobj\n'.encode('latin-1', 'replace'))
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    for obj_id in range(1, len(objects) + 1):
+        out.write(f'{offsets[obj_id]:010d} 00000 n \n'.encode())
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+    return out.getvalue()
+
+
+FORMATS = {'txt': to_txt, 'pdf': to_pdf, 'docx': to_docx}
@@ -0,0 +1,55 @@
+"""Streaming DocxReader against the python-docx object model on large documents.
+
+Usage: python -m jobdone.benchmarks.docx_reader [n_paragraphs]
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+from docx import Document
+
+from jobdone.file_processor.docx_reader import DocxReader
+
+
+def make_docx(n_paragraphs):
+    doc = Document()
+    for i in range(n_paragraphs):
+        doc.add_paragraph(f"Paragraph {i}: led a team building Python services on AWS with Docker.")
+        if i % 100 == 0:
+            table = doc.add_table(rows=3, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "Kubernetes, SQL, machine learning"
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def read_with_document(data):
+    doc = Document(io.BytesIO(data))
+    return '\n'.join(paragraph.text for paragraph in doc.paragraphs).strip()
+
+
+def measure(func, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = func(data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, elapsed, peak
+
+
+def main(n_paragraphs=20000):
+    data = make_docx(n_paragraphs)
+    reader = DocxReader()
+    print(f"document: {n_paragraphs} paragraphs, {len(data) / 1024:.0f} KiB")
+    for name, func in [('python-docx', read_with_document),
+                       ('streaming', lambda d: reader.read(io.BytesIO(d)))]:
+        text, elapsed, peak = measure(func, data)
+        print(f"{name:12} {elapsed:7.3f}s  peak {peak / 1024 / 1024:6.1f} MiB  {len(text):,} chars")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
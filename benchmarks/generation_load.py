@@ -0,0 +1,68 @@
+"""Load test of the generation scheduler against a local fake completion server.
+
+Usage: python -m jobdone.benchmarks.generation_load [--requests 60] [--concurrency 20]
+                                                    [--throttle 0.3] [--fail 0.1]
+                                                    [--rate 5] [--max-in-flight 4]
+
+The fake server (jobdone.testing.fake_completion) answers a --throttle
+fraction of requests with 429 plus Retry-After and a --fail fraction with
+500, and counts how many requests it has open at once. The client is pointed
+at it through GROQ_BASE_URL.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jobdone.testing.fake_completion import FakeCompletionServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--concurrency', type=int, default=20, help='client threads')
+    parser.add_argument('--throttle', type=float, default=0.3, help='fraction answered with 429')
+    parser.add_argument('--fail', type=float, default=0.1, help='fraction answered with 500')
+    parser.add_argument('--rate', type=float, default=5.0, help='scheduler requests per second')
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    parser.add_argument('--max-retries', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    server = FakeCompletionServer(args.throttle, args.fail).start()
+    os.environ['GROQ_BASE_URL'] = server.url
+    os.environ.setdefault('GROQ_API_KEY', 'fake')
+
+    from jobdone.resume_generator.ai_generator import ResumeGenerator
+    from jobdone.resume_generator.scheduler import RequestScheduler
+    scheduler = RequestScheduler(rate=args.rate, burst=args.burst, max_in_flight=args.max_in_flight,
+                                 max_retries=args.max_retries)
+    generator = ResumeGenerator(cache=None, scheduler=scheduler)
+
+    latencies = []
+
+    def one(i):
+        start = time.perf_counter()
+        content = generator.generate_content(f"resume {i}", "job description")
+        latencies.append(time.perf_counter() - start)
+        return content
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        results = list(executor.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    latencies.sort()
+    fallbacks = sum(result.fallback for result in results)
+    print(f"requests:        {args.requests} in {elapsed:.2f}s")
+    print(f"server:          {server.counts}")
+    print(f"scheduler:       {scheduler.stats()}")
+    print(f"fallbacks:       {fallbacks}")
+    print(f"latency p50/p95: {latencies[len(latencies) // 2]:.2f}s / {latencies[int(len(latencies) * 0.95) - 1]:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
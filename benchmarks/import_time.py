@@ -0,0 +1,52 @@
+"""Cold import cost of the app and library modules, each in a fresh interpreter.
+
+Usage: python -m jobdone.benchmarks.import_time
+"""
+import json
+import subprocess
+import sys
+
+MODULES = [
+    'jobdone.file_processor.registry',
+    'jobdone.analyzers.nlp',
+    'jobdone.analyzers.keyword_matcher',
+    'jobdone.analyzers.score_calculator',
+    'jobdone.analyzers.word_cloud_generator',
+    'jobdone.resume_generator.ai_generator',
+    'jobdone.app.main',
+]
+
+HEAVY = ['PyPDF2', 'docx', 'spacy', 'sklearn', 'matplotlib', 'wordcloud', 'groq', 'streamlit']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=3):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def main():
+    for module in MODULES:
+        try:
+            result = measure(module)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:42} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{module:42} {result['seconds'] * 1000:8.1f} ms  loads: {', '.join(result['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
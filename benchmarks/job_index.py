@@ -0,0 +1,48 @@
+"""Ranking postings with JobIndex against calculate_score over every posting.
+
+Usage: python -m jobdone.benchmarks.job_index [n_postings]
+"""
+import sys
+import tempfile
+import time
+
+from jobdone.analyzers.score_calculator import ScoreCalculator
+from jobdone.benchmarks.corpus import make_job_description, make_resume
+from jobdone.job_index.index import JobIndex
+
+
+def main(n_postings=5000, n_check=200, k=10):
+    postings = [(f"job-{i}", make_job_description(250, seed=i)) for i in range(n_postings)]
+    resume = make_resume(800, seed=1)
+    calculator = ScoreCalculator()
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        index = JobIndex(path, score_calculator=calculator)
+        for offset in range(0, n_postings, 500):
+            index.add_many(postings[offset:offset + 500])
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = JobIndex(path, score_calculator=calculator)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = index.search(resume, k=k)
+        search_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _, text in postings[:n_check]:
+        calculator.calculate_score(resume, text)
+    brute_time = (time.perf_counter() - start) * n_postings / n_check
+
+    print(f"postings:           {n_postings}")
+    print(f"build:              {build_time:.2f}s")
+    print(f"open:               {load_time * 1000:.1f}ms")
+    print(f"search top {k}:      {search_time:.3f}s")
+    print(f"calculate_score:    {brute_time:.2f}s (extrapolated from {n_check})")
+    print(f"best match:         {results[0] if results else None}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,114 @@
+"""Load time, memory and throughput of each NLP profile, and its score deltas.
+
+Usage: python -m jobdone.benchmarks.nlp_profiles [--docs 300] [--pairs 100]
+                                                 [--output report.json]
+
+Every profile is loaded cold (after spaCy itself is imported) with
+tracemalloc tracing the allocations of the load. Throughput is measured with
+nlp.pipe over synthetic resumes. Scores and found keywords for synthetic
+resume/job pairs are compared against the "accurate" profile.
+
+No reference numbers are kept in the repo. Run this where en_core_web_sm
+is installed and keep the --output JSON next to the deployment that
+chooses between the profiles.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from jobdone.analyzers import nlp
+from jobdone.benchmarks.corpus import make_job_description, make_resume
+
+BASELINE = 'accurate'
+
+
+def measure_load(name):
+    import spacy  # noqa: F401 -- the import itself is not part of any profile's cost
+    nlp._models.pop(name, None)
+    tracemalloc.start()
+    start = time.perf_counter()
+    pipeline = nlp.load_model(name)
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pipeline, {
+        'load_seconds': seconds,
+        'resident_mib': current / 2 ** 20,
+        'peak_load_mib': peak / 2 ** 20,
+        'pipeline': pipeline.pipe_names,
+    }
+
+
+def measure_throughput(pipeline, texts):
+    start = time.perf_counter()
+    for _ in pipeline.pipe((text.lower() for text in texts), batch_size=64):
+        pass
+    return len(texts) / (time.perf_counter() - start)
+
+
+def analyze_pairs(name, pairs):
+    from jobdone.analyzers.keyword_matcher import KeywordMatcher
+    from jobdone.analyzers.score_calculator import ScoreCalculator
+    score_calculator = ScoreCalculator(name)
+    keyword_matcher = KeywordMatcher(name)
+    return [(score_calculator.calculate_score(resume, job), set(keyword_matcher.find_matches(resume, job)['found']))
+            for resume, job in pairs]
+
+
+def compare(results, baseline):
+    deltas = [abs(score - base_score) for (score, _), (base_score, _) in zip(results, baseline)]
+    overlaps = [len(found & base_found) / len(found | base_found) if found | base_found else 1.0
+                for (_, found), (_, base_found) in zip(results, baseline)]
+    return {
+        'mean_abs_score_delta': statistics.mean(deltas),
+        'max_abs_score_delta': max(deltas),
+        'scores_changed': sum(delta > 0 for delta in deltas) / len(deltas),
+        'mean_keyword_jaccard': statistics.mean(overlaps),
+    }
+
+
+def run(profiles, n_docs=300, n_pairs=100):
+    texts = [make_resume(400, seed=i) for i in range(n_docs)]
+    pairs = [(make_resume(600, seed=10_000 + i), make_job_description(200, seed=i)) for i in range(n_pairs)]
+
+    report = {}
+    for name in profiles:
+        pipeline, stats = measure_load(name)
+        stats['docs_per_second'] = measure_throughput(pipeline, texts)
+        report[name] = stats
+
+    baseline = analyze_pairs(BASELINE, pairs)
+    for name in profiles:
+        if name != BASELINE:
+            report[name]['vs_' + BASELINE] = compare(analyze_pairs(name, pairs), baseline)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=list(nlp.PROFILES))
+    parser.add_argument('--docs', type=int, default=300, help='documents for the throughput run')
+    parser.add_argument('--pairs', type=int, default=100, help='resume/job pairs for the score comparison')
+    parser.add_argument('--output', help='write the report to this JSON file')
+    args = parser.parse_args(argv)
+
+    report = run(args.profiles, args.docs, args.pairs)
+    for name, stats in report.items():
+        print(f"{name:10} load {stats['load_seconds']:6.2f}s  resident {stats['resident_mib']:7.1f} MiB  "
+              f"{stats['docs_per_second']:8.1f} docs/s  [{', '.join(stats['pipeline'])}]")
+        delta = stats.get('vs_' + BASELINE)
+        if delta:
+            print(f"{'':10} vs {BASELINE}: mean |score delta| {delta['mean_abs_score_delta']:.3f}, "
+                  f"max {delta['max_abs_score_delta']:.1f}, {delta['scores_changed'] * 100:.0f}% of scores changed, "
+                  f"keyword Jaccard {delta['mean_keyword_jaccard']:.3f}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Single-pass RequirementMatcher against the old per-requirement substring scans.
+
+Usage: python -m jobdone.benchmarks.requirement_matching [resume_words] [requirements]
+"""
+import random
+import sys
+import time
+
+from jobdone.analyzers.requirement_matcher import RequirementMatcher
+
+
+def substring_points(requirements, resume_text):
+    """The requirement loop ScoreCalculator.calculate_score used before RequirementMatcher."""
+    resume_text_lower = resume_text.lower()
+    matches = 0
+    for req in requirements:
+        req_lower = req.lower()
+        if req_lower in resume_text_lower:
+            matches += 1.5
+        else:
+            req_words = req_lower.split()
+            if len(req_words) > 1:
+                matched_words = sum(1 for word in req_words
+                                    if word in resume_text_lower and len(word) > 3)
+                matches += (matched_words / len(req_words)) * 1.2
+    return matches
+
+
+def make_words(rng, n):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(n)]
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(resume_words=20000, n_requirements=400):
+    rng = random.Random(0)
+    vocabulary = make_words(rng, 5000)
+    resume = ' '.join(rng.choice(vocabulary) for _ in range(resume_words))
+    requirements = [' '.join(rng.choice(vocabulary) for _ in range(rng.choice([1, 1, 2, 3])))
+                    for _ in range(n_requirements)]
+
+    old = timed(lambda: substring_points(requirements, resume))
+    new = timed(lambda: sum(item['points'] for item in RequirementMatcher(requirements).match(resume)))
+
+    print(f"resume: {resume_words} words, requirements: {n_requirements}")
+    print(f"substring scans:     {old * 1000:8.2f} ms")
+    print(f"RequirementMatcher:  {new * 1000:8.2f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,137 @@
+"""Offline benchmark harness: times every pipeline stage at several input sizes.
+
+Usage:
+    python -m jobdone.benchmarks.run [--sizes 500 2000 8000] [--repeat 5]
+                                     [--output results.json]
+                                     [--baseline baseline.json] [--threshold 0.2]
+                                     [--save-baseline baseline.json]
+
+Results are written as JSON. With --baseline, every stage is compared to the
+stored result for the same size and the run exits non-zero if any stage got
+slower than the baseline by more than --threshold (a fraction, 0.2 = 20%).
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+
+from jobdone.benchmarks.corpus import FORMATS, make_job_description, make_resume
+
+DEFAULT_SIZES = [500, 2000, 8000]
+
+
+def _time(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'median': statistics.median(timings), 'min': min(timings), 'runs': repeat}
+
+
+def _clear_caches():
+    # Every stage is timed cold so results measure the work, not the caches
+    from jobdone.analyzers import keyword_matcher, nlp, word_cloud_generator
+    nlp.document_cache.clear()
+    keyword_matcher.job_index_cache.clear()
+    with word_cloud_generator._image_cache_lock:
+        word_cloud_generator._image_cache.clear()
+
+
+def stages(size):
+    """(name, func) pairs for one input size; imports happen outside the timings."""
+    from jobdone.analyzers.keyword_matcher import KeywordMatcher
+    from jobdone.analyzers.nlp import load_model
+    from jobdone.analyzers.score_calculator import ScoreCalculator
+    from jobdone.analyzers.word_cloud_generator import WordCloudGenerator
+    from jobdone.file_processor.registry import registry
+    from jobdone.resume_generator.ai_generator import ResumeGenerator
+
+    resume = make_resume(size, seed=size)
+    job_desc = make_job_description(max(size // 4, 200), seed=size)
+    nlp = load_model()
+    score_calculator = ScoreCalculator()
+    keyword_matcher = KeywordMatcher()
+    word_cloud = WordCloudGenerator()
+    # The client is never called: only document rendering is timed
+    resume_gen = ResumeGenerator(client=object(), cache=None)
+
+    result = []
+    for fmt, encode in FORMATS.items():
+        data = encode(resume)
+        result.append((f'extract_{fmt}', lambda data=data: registry.extract(io.BytesIO(data), cache=None)))
+    result += [
+        ('spacy_parse', lambda: nlp(resume.lower())),
+        ('score', lambda: score_calculator.calculate_score(resume, job_desc)),
+        ('keyword_match', lambda: keyword_matcher.find_matches(resume, job_desc)),
+        ('word_cloud', lambda: word_cloud.generate(job_desc)),
+        ('docx_generation', lambda: resume_gen.create_document(resume)),
+    ]
+    return result
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5):
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': {},
+    }
+    for size in sizes:
+        size_results = {}
+        for name, func in stages(size):
+            func()  # warm-up: model loads and lazy imports are not part of a stage
+            size_results[name] = _time(func, repeat, setup=_clear_caches)
+            print(f"{size:>6} words  {name:16} {size_results[name]['median'] * 1000:10.2f} ms")
+        results['results'][str(size)] = size_results
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return regressions as (size, stage, baseline_seconds, seconds) tuples."""
+    regressions = []
+    for size, size_results in results['results'].items():
+        for stage, timing in size_results.items():
+            base = baseline.get('results', {}).get(size, {}).get(stage)
+            if base and timing['median'] > base['median'] * (1 + threshold):
+                regressions.append((size, stage, base['median'], timing['median']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='resume sizes in words; postings are a quarter of that')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against this stored results file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown over the baseline, as a fraction')
+    parser.add_argument('--save-baseline', help='store these results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat)
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for size, stage, before, after in regressions:
+            print(f"REGRESSION {stage} at {size} words: {before * 1000:.2f} ms -> {after * 1000:.2f} ms "
+                  f"({(after / before - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"No stage regressed by more than {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
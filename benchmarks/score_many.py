@@ -0,0 +1,52 @@
+"""Throughput of ScoreCalculator.score_many against the one-pair-at-a-time loop.
+
+Usage: python -m jobdone.benchmarks.score_many [n_resumes]
+"""
+import random
+import sys
+import time
+
+from jobdone.analyzers.score_calculator import ScoreCalculator
+
+SKILLS = ['python', 'java', 'sql', 'aws', 'docker', 'kubernetes', 'react', 'django',
+          'machine learning', 'data pipelines', 'rest apis', 'ci/cd', 'leadership']
+FILLER = ['built', 'designed', 'led', 'team', 'systems', 'services', 'customers',
+          'improved', 'delivered', 'projects', 'production', 'platform', 'with', 'and']
+
+JOB_DESC = (
+    "We are hiring a backend engineer. Requirements: 5+ years of experience with Python "
+    "and Django, strong knowledge of SQL and AWS. Experience with Docker and Kubernetes is "
+    "required. Must have proficiency in REST APIs and data pipelines. Machine learning "
+    "background is a plus. Bachelor degree in computer science or equivalent experience."
+)
+
+
+def make_resume(rng, n_words=250):
+    words = [rng.choice(SKILLS) if rng.random() < 0.15 else rng.choice(FILLER)
+             for _ in range(n_words)]
+    return f"{rng.randint(1, 12)} years of experience. " + " ".join(words)
+
+
+def main(n_resumes=10000, n_check=200):
+    rng = random.Random(0)
+    resumes = [make_resume(rng) for _ in range(n_resumes)]
+    calculator = ScoreCalculator()
+    calculator.extract_key_requirements(JOB_DESC)  # warm the model and parse cache
+
+    start = time.perf_counter()
+    batch_scores = calculator.score_many(JOB_DESC, resumes)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single_scores = [calculator.calculate_score(resume, JOB_DESC) for resume in resumes[:n_check]]
+    single_time = (time.perf_counter() - start) * n_resumes / n_check
+
+    mismatches = sum(a != b for a, b in zip(batch_scores, single_scores))
+    print(f"resumes:            {n_resumes}")
+    print(f"score_many:         {batch_time:.2f}s ({n_resumes / batch_time:,.0f} resumes/s)")
+    print(f"calculate_score:    {single_time:.2f}s (extrapolated from {n_check})")
+    print(f"mismatches checked: {mismatches}/{n_check}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
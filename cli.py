@@ -0,0 +1,59 @@
+"""Command-line entry point (`jobdone`).
+
+    jobdone batch jobs.jsonl [-o results.jsonl] [--workers N] [--resume]
+    jobdone serve [--host 0.0.0.0] [--port 8080] [--workers N]
+"""
+import argparse
+import sys
+
+
+def _batch(args):
+    from jobdone.batch.pipeline import run_batch
+    counts = run_batch(
+        args.input,
+        output_path=args.output,
+        workers=args.workers,
+        resume=args.resume,
+        max_in_flight=args.max_in_flight,
+        model=args.model,
+    )
+    return 1 if counts['errors'] else 0
+
+
+def _serve(args):
+    from jobdone.service.server import serve
+    serve(host=args.host, port=args.port, workers=args.workers, model=args.model,
+          max_pending=args.max_pending, max_body_bytes=args.max_body_bytes)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='jobdone')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='score resumes against job descriptions listed in a JSONL file')
+    batch.add_argument('input', help='JSONL file; each line has "resume" and "job_description" paths and an optional "id"')
+    batch.add_argument('-o', '--output', default='-', help='JSONL results file (default: stdout)')
+    batch.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    batch.add_argument('--max-in-flight', type=int, help='requests queued at once (default: 4 per worker)')
+    batch.add_argument('--resume', action='store_true', help='append to --output, skipping ids it already has')
+    batch.add_argument('--model', help='NLP profile (fast, accurate) or spaCy model name')
+    batch.set_defaults(func=_batch)
+
+    serve = commands.add_parser('serve', help='run the HTTP analysis service')
+    serve.add_argument('--host', default='0.0.0.0')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--workers', type=int, help='analysis worker processes (default: CPU count)')
+    serve.add_argument('--max-pending', type=int, help='requests admitted at once before answering 503 (default: 4 per worker)')
+    serve.add_argument('--max-body-bytes', type=int, default=10 * 1024 * 1024, help='largest accepted request body')
+    serve.add_argument('--model', help='NLP profile (fast, accurate) or spaCy model name')
+    serve.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    if args.command == 'batch' and args.resume and args.output == '-':
+        parser.error('--resume needs an --output file')
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
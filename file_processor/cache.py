@@ -0,0 +1,131 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+class ExtractionCache:
+    """Content-addressed cache of extracted text in front of the file readers.
+
+    Entries are keyed by the reader and a hash of the file bytes, so the same
+    upload is only parsed once however many reruns, sessions or batch jobs
+    see it. The in-memory tier is an LRU bounded by entry count; the optional
+    on-disk tier lives in `directory` and is trimmed oldest-first once it
+    grows past `max_disk_bytes`.
+    """
+
+    def __init__(self, max_entries=128, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def read(self, reader, file):
+        """Return reader.read(file), using the cached text when the bytes were seen before."""
+        data = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+        key = f"{type(reader).__name__}-{hashlib.sha256(data).hexdigest()}"
+
+        text = self._get_memory(key)
+        if text is not None:
+            return text
+
+        text = self._get_disk(key)
+        if text is not None:
+            self._put_memory(key, text)
+            return text
+
+        with self._lock:
+            self.misses += 1
+        text = reader.read(io.BytesIO(data))
+        self._put_memory(key, text)
+        self._put_disk(key, text)
+        return text
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def _get_memory(self, key):
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            return text
+
+    def _put_memory(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.txt')
+
+    def _get_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            # Touch the entry so eviction drops the least recently used files first
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        return text
+
+    def _put_disk(self, key, text):
+        if not self.directory:
+            return
+        try:
+            # Write to a temporary file first so other workers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"Extraction cache write failed: {str(e)}")
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.txt'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+extraction_cache = ExtractionCache(directory=os.getenv("JOBDONE_EXTRACTION_CACHE_DIR"))
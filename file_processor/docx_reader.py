@@ -1,13 +1,64 @@
-from docx import Document
 import io
+import zipfile
+import xml.etree.ElementTree as ET
+from jobdone.metrics.spans import timed
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
 
 class DocxReader:
+    @timed('extract.docx')
     def read(self, file):
         try:
-            doc = Document(io.BytesIO(file.read()))
-            text = []
-            for paragraph in doc.paragraphs:
-                text.append(paragraph.text)
-            return '\n'.join(text).strip()
+            return '\n'.join(self.iter_paragraphs(file)).strip()
         except Exception as e:
-            raise Exception(f"Error reading DOCX file: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error reading DOCX file: {str(e)}")
+
+    def iter_paragraphs(self, file):
+        """Stream paragraph text, including table cells and text boxes, in document order.
+
+        Reads word/document.xml straight out of the zip with an incremental
+        parser instead of building the python-docx object model, and drops
+        each body element once it has been processed so memory stays bounded.
+        """
+        if not (hasattr(file, 'seek') and hasattr(file, 'tell')):
+            file = io.BytesIO(file.read())
+
+        with zipfile.ZipFile(file) as archive, archive.open('word/document.xml') as xml:
+            # One text buffer per open paragraph; text boxes nest paragraphs
+            paragraphs = []
+            body = None
+            depth = 0
+            fallback_depth = None
+
+            for event, elem in ET.iterparse(xml, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    depth += 1
+                    if tag == W_NS + 'body':
+                        body = elem
+                    elif tag == MC_FALLBACK and fallback_depth is None:
+                        # Fallback duplicates the text box content of mc:Choice
+                        fallback_depth = depth
+                    elif tag == W_NS + 'p' and fallback_depth is None:
+                        paragraphs.append([])
+                    continue
+
+                if fallback_depth is not None:
+                    if depth == fallback_depth:
+                        fallback_depth = None
+                elif paragraphs:
+                    if tag == W_NS + 't':
+                        paragraphs[-1].append(elem.text or '')
+                    elif tag == W_NS + 'tab' and not elem.attrib:
+                        # Run-level tabs only; tab stops in <w:tabs> carry attributes
+                        paragraphs[-1].append('\t')
+                    elif tag in (W_NS + 'br', W_NS + 'cr'):
+                        paragraphs[-1].append('\n')
+                    elif tag == W_NS + 'p':
+                        yield ''.join(paragraphs.pop())
+
+                depth -= 1
+                if body is not None and depth == 2:
+                    # Finished a direct child of <w:body>: release it
+                    body.remove(elem)
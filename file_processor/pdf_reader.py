@@ -1,13 +1,62 @@
 import PyPDF2
 import io
+from concurrent.futures import ProcessPoolExecutor
+from jobdone.metrics.spans import timed
+
+def _extract_page_range(data, start, stop):
+    """Extract pages [start, stop) from raw PDF bytes; runs in a worker process."""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
 
 class PDFReader:
+    def __init__(self, max_pages=None, max_bytes=None, workers=None, pages_per_task=8):
+        # Uploads over either limit are rejected with ValueError rather than
+        # pinning a worker; None means unlimited
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        # Set workers > 1 to extract page ranges in a process pool
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+
+    @timed('extract.pdf')
     def read(self, file):
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text.strip()
+            return '\n'.join(self.iter_pages(file)).strip()
         except Exception as e:
-            raise Exception(f"Error reading PDF file: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error reading PDF file: {str(e)}")
+
+    def iter_pages(self, file):
+        """Yield the text of each page in order."""
+        data = self._read_bytes(file)
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(pdf_reader.pages)
+        if self.max_pages is not None and page_count > self.max_pages:
+            raise ValueError(f"PDF has {page_count} pages, over the {self.max_pages} page limit")
+
+        if self.workers and self.workers > 1 and page_count > self.pages_per_task:
+            yield from self._iter_pages_parallel(data, page_count)
+        else:
+            for i in range(page_count):
+                yield pdf_reader.pages[i].extract_text() or ""
+
+    def _iter_pages_parallel(self, data, page_count):
+        ranges = [(start, min(start + self.pages_per_task, page_count))
+                  for start in range(0, page_count, self.pages_per_task)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(_extract_page_range, data, start, stop)
+                       for start, stop in ranges]
+            try:
+                for future in futures:
+                    yield from future.result()
+            finally:
+                # Stop queued ranges if the consumer stops early or a range fails
+                for future in futures:
+                    future.cancel()
+
+    def _read_bytes(self, file):
+        if self.max_bytes is None:
+            return file.read()
+        data = file.read(self.max_bytes + 1)
+        if len(data) > self.max_bytes:
+            raise ValueError(f"PDF exceeds the {self.max_bytes} byte limit")
+        return data
@@ -0,0 +1,136 @@
+import importlib
+import io
+import os
+import threading
+import zipfile
+from jobdone.file_processor.cache import extraction_cache
+
+# Enough of a file to recognise the formats whose sniff only needs its start
+SNIFF_BYTES = 1024
+
+def _is_pdf(data):
+    # The header may be preceded by a little junk, which readers tolerate
+    return b'%PDF-' in data[:SNIFF_BYTES]
+
+def _is_docx(data):
+    if not data.startswith(b'PK\x03\x04'):
+        return False
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return 'word/document.xml' in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+def _env_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+class ReaderFormat:
+    def __init__(self, name, reader_path, extensions=(), sniff=None, options=None):
+        self.name = name
+        # "module:Class", imported only when the format is first used
+        self.reader_path = reader_path
+        self.extensions = tuple(ext.lower().lstrip('.') for ext in extensions)
+        self.sniff = sniff
+        # Keyword arguments for the reader's constructor
+        self.options = dict(options or {})
+
+class ReaderRegistry:
+    """Maps file contents to readers, importing each reader's backend on first use."""
+
+    def __init__(self, default='txt'):
+        self.default = default
+        self._formats = {}
+        self._readers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, reader_path, extensions=(), sniff=None, options=None):
+        self._formats[name] = ReaderFormat(name, reader_path, extensions, sniff, options)
+        self._readers.pop(name, None)
+
+    def configure(self, name, **options):
+        """Change reader options for a format, e.g. configure('pdf', max_pages=20)."""
+        with self._lock:
+            self._formats[name].options.update(options)
+            # The next get_reader() builds a reader with the new options
+            self._readers.pop(name, None)
+
+    def formats(self):
+        return list(self._formats)
+
+    def detect(self, data, filename=None):
+        """Return the format name for `data`, trusting magic bytes over the filename."""
+        for fmt in self._formats.values():
+            if fmt.sniff and fmt.sniff(data):
+                return fmt.name
+
+        if filename:
+            ext = os.path.splitext(filename)[1].lower().lstrip('.')
+            for fmt in self._formats.values():
+                if ext in fmt.extensions and not fmt.sniff:
+                    return fmt.name
+
+        return self.default
+
+    def get_reader(self, name):
+        reader = self._readers.get(name)
+        if reader is None:
+            with self._lock:
+                reader = self._readers.get(name)
+                if reader is None:
+                    fmt = self._formats[name]
+                    module_name, class_name = fmt.reader_path.split(':')
+                    reader = getattr(importlib.import_module(module_name), class_name)(**fmt.options)
+                    self._readers[name] = reader
+        return reader
+
+    def extract(self, file, cache=extraction_cache):
+        filename = getattr(file, 'name', None)
+        data = self._read(file, filename)
+        name = self.detect(data, filename)
+        # Formats only recognised from the whole file are checked once it is read
+        self._check_size(name, len(data))
+        reader = self.get_reader(name)
+        if cache is None:
+            return reader.read(io.BytesIO(data))
+        return cache.read(reader, io.BytesIO(data))
+
+    def _read(self, file, filename):
+        """Read a whole file, stopping early once it is over its format's byte limit.
+
+        The format is first detected from the opening SNIFF_BYTES, so a
+        `max_bytes` option bounds the read itself rather than being checked
+        after the file was loaded and hashed.
+        """
+        if hasattr(file, 'getvalue'):
+            # Uploads are read whole wherever an earlier read left them
+            file.seek(0)
+        head = file.read(SNIFF_BYTES)
+        name = self.detect(head, filename)
+        limit = self._formats[name].options.get('max_bytes')
+        if limit is None:
+            return head + file.read()
+        data = head + file.read(max(limit + 1 - len(head), 0))
+        self._check_size(name, len(data))
+        return data
+
+    def _check_size(self, name, size):
+        limit = self._formats[name].options.get('max_bytes')
+        if limit is not None and size > limit:
+            raise ValueError(f"{name.upper()} exceeds the {limit} byte limit")
+
+
+registry = ReaderRegistry()
+# PDF size limits and page-extraction processes default from the environment
+registry.register('pdf', 'jobdone.file_processor.pdf_reader:PDFReader', ['.pdf'], sniff=_is_pdf, options={
+    'max_pages': _env_int("JOBDONE_PDF_MAX_PAGES"),
+    'max_bytes': _env_int("JOBDONE_PDF_MAX_BYTES"),
+    'workers': _env_int("JOBDONE_PDF_WORKERS"),
+})
+registry.register('docx', 'jobdone.file_processor.docx_reader:DocxReader', ['.docx'], sniff=_is_docx)
+registry.register('txt', 'jobdone.file_processor.text_reader:TextReader', ['.txt'])
+
+
+def extract(file):
+    """Extract text from an uploaded or opened file, whatever its format."""
+    return registry.extract(file)
@@ -1,6 +1,8 @@
 import io
+from jobdone.metrics.spans import timed
 
 class TextReader:
+    @timed('extract.txt')
     def read(self, file):
         try:
             text = file.read().decode('utf-8')
@@ -0,0 +1,364 @@
+"""Persistent index of job postings for ranking many postings against one resume.
+
+Postings are stored in append-only segments under one directory:
+
+    manifest.json        live segments and the rows removed from each
+    vocabulary.json      terms in column order; only ever grows
+    seg-000001/
+        indptr.npy, indices.npy, data.npy   CSR rows of term weights
+        text_offsets.npy, texts.bin         posting texts, read on demand
+        postings.json                       ids and extracted requirements
+
+Arrays are memory-mapped, so opening an index costs little more than reading
+the manifest, vocabulary and ids. Every add writes a new segment and removals
+are recorded in the manifest; once there are too many segments, or removed
+rows pile up, the live rows are merged into one segment. A segment only
+counts once the manifest lists it, so a write interrupted by a crash leaves
+an unlisted directory behind. A new segment never takes the name of a
+directory already on disk.
+
+Changes are made under an exclusive lock on the .lock file, so writers in
+several processes take turns. A writer first reloads the index if another
+process changed it, then deletes unlisted segments and temporary files;
+with the lock held, none of them can belong to a write still in progress.
+Opening or searching an index never changes it.
+
+search() ranks in two stages. Each posting row holds L2-normalised
+sublinear term frequencies; the resume vector is weighted by idf squared
+(idf from the live postings), so one sparse matrix-vector product per segment
+gives every posting a TF-IDF similarity. It is not an exact cosine: posting
+rows are normalised before idf is applied, since idf changes as postings
+come and go. It only picks the shortlist. The best `shortlist` postings are
+then rescored with ScoreCalculator.calculate_score using the stored
+requirements, so final scores equal a direct calculate_score call.
+"""
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from jobdone.analyzers.nlp import DEFAULT_MODEL, as_text, parse_many
+
+MANIFEST = 'manifest.json'
+VOCABULARY = 'vocabulary.json'
+LOCK = '.lock'
+MAX_SEGMENTS = 16
+
+# The same tokenization ScoreCalculator uses for its TF-IDF similarity
+_analyze = CountVectorizer(stop_words='english').build_analyzer()
+
+
+def _write_json(path, value):
+    # Write to a temporary file first so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _term_counts(text):
+    counts = {}
+    for term in _analyze(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+class _Segment:
+    def __init__(self, path, vocabulary_size):
+        self.name = os.path.basename(path)
+        self.path = path
+        indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')
+        indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode='r')
+        data = np.load(os.path.join(path, 'data.npy'), mmap_mode='r')
+        self.matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, vocabulary_size),
+                                        copy=False)
+        self.text_offsets = np.load(os.path.join(path, 'text_offsets.npy'), mmap_mode='r')
+        postings = _read_json(os.path.join(path, 'postings.json'), {})
+        self.ids = postings['ids']
+        self.requirements = postings['requirements']
+
+    def text(self, row):
+        start, stop = int(self.text_offsets[row]), int(self.text_offsets[row + 1])
+        with open(os.path.join(self.path, 'texts.bin'), 'rb') as f:
+            f.seek(start)
+            return f.read(stop - start).decode('utf-8')
+
+    def resize(self, vocabulary_size):
+        # Older segments never use newer terms, so widening is only a shape change
+        matrix = self.matrix
+        self.matrix = sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                                        shape=(matrix.shape[0], vocabulary_size), copy=False)
+
+
+class JobIndex:
+    def __init__(self, path, model=DEFAULT_MODEL, score_calculator=None):
+        self.path = path
+        self.model = model
+        self._score_calculator = score_calculator
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._load(self._read_manifest())
+
+    @property
+    def score_calculator(self):
+        if self._score_calculator is None:
+            from jobdone.analyzers.score_calculator import ScoreCalculator
+            self._score_calculator = ScoreCalculator(self.model)
+        return self._score_calculator
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, job_id):
+        return str(job_id) in self._locations
+
+    def ids(self):
+        return list(self._locations)
+
+    def add(self, job_id, text):
+        self.add_many([(job_id, text)])
+
+    def add_many(self, postings):
+        """Add (id, text) pairs as one new segment; an existing id is replaced."""
+        postings = [(str(job_id), as_text(text)) for job_id, text in postings]
+        if not postings:
+            return
+        # Parse every posting in one pipe; requirement extraction then hits the parse cache
+        parse_many([text for _, text in postings], self.model)
+        requirements = [self.score_calculator.extract_key_requirements(text) for _, text in postings]
+
+        with self._writing():
+            for job_id, _ in postings:
+                if job_id in self._locations:
+                    self._remove_row(*self._locations[job_id])
+            self._write_segment(postings, requirements)
+            removed_rows = sum(len(rows) for rows in self._removed.values())
+            if len(self._segments) > MAX_SEGMENTS or removed_rows > len(self._locations):
+                self._merge()
+            else:
+                self._save_manifest()
+
+    def remove(self, job_id):
+        """Remove a posting; returns False if it was not in the index."""
+        job_id = str(job_id)
+        with self._writing():
+            if job_id not in self._locations:
+                return False
+            self._remove_row(*self._locations[job_id])
+            self._locate_postings()
+            self._save_manifest()
+            return True
+
+    def compact(self):
+        """Merge every live posting into a single segment."""
+        with self._writing():
+            self._merge()
+
+    def candidates(self, resume_text, n=50):
+        """The `n` postings with the highest TF-IDF similarity, as (id, similarity) pairs."""
+        with self._lock:
+            query = self._query_vector(as_text(resume_text))
+            # Writes replace each segment's matrix and live mask rather than
+            # changing them, so these stay the shape of the query vector
+            segments = [(segment.matrix, segment.live, segment.ids) for segment in self._segments]
+        if query is None:
+            return []
+
+        scored = []
+        for matrix, live, ids in segments:
+            live = np.flatnonzero(live)
+            if not len(live):
+                continue
+            similarity = matrix @ query
+            if len(live) > n:
+                live = live[np.argpartition(-similarity[live], n)[:n]]
+            top = live[np.argsort(-similarity[live], kind='stable')]
+            scored.extend((float(similarity[row]), ids[row]) for row in top)
+
+        scored.sort(key=lambda item: -item[0])
+        return [(job_id, similarity) for similarity, job_id in scored[:n]]
+
+    def search(self, resume_text, k=10, shortlist=None):
+        """Top `k` postings for a resume, each as {'id', 'score', 'similarity'}.
+
+        The `shortlist` (default 5 * k, at least 50) best postings by TF-IDF
+        similarity are rescored with the full ScoreCalculator logic.
+        """
+        resume_text = as_text(resume_text)
+        shortlist = shortlist or max(5 * k, 50)
+        results = []
+        for job_id, similarity in self.candidates(resume_text, shortlist):
+            with self._lock:
+                if job_id not in self._locations:
+                    # Removed since the candidates were picked
+                    continue
+                segment, row = self._locations[job_id]
+                job_text, requirements = segment.text(row), segment.requirements[row]
+            score = self.score_calculator.calculate_score(resume_text, job_text, key_requirements=requirements)
+            results.append({'id': job_id, 'score': score, 'similarity': similarity})
+
+        results.sort(key=lambda result: (-result['score'], -result['similarity']))
+        return results[:k]
+
+    def _read_manifest(self):
+        return _read_json(os.path.join(self.path, MANIFEST), {'segments': [], 'removed': {}, 'next_segment': 1})
+
+    def _load(self, manifest):
+        self._manifest = manifest
+        self._next_segment = manifest['next_segment']
+        self._removed = {name: set(rows) for name, rows in manifest['removed'].items()}
+        self._terms = _read_json(os.path.join(self.path, VOCABULARY), [])
+        self._vocabulary = {term: column for column, term in enumerate(self._terms)}
+        self._segments = [_Segment(os.path.join(self.path, name), len(self._terms))
+                          for name in manifest['segments']]
+        self._locate_postings()
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Hold this instance's lock and the index's file lock while changing the index."""
+        with self._lock, open(os.path.join(self.path, LOCK), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            manifest = self._read_manifest()
+            if manifest != self._manifest:
+                # Another process wrote since this one last loaded or saved
+                self._load(manifest)
+            self._remove_unlisted(manifest['segments'])
+            yield
+
+    def _remove_unlisted(self, listed):
+        # Left behind by writes and merges interrupted before the manifest save.
+        # Only called under the file lock, so no write is still using them.
+        for entry in os.scandir(self.path):
+            if entry.is_dir() and entry.name not in listed and entry.name.startswith(('.tmp-', 'seg-')):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.is_file() and entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+
+    def _remove_row(self, segment, row):
+        self._removed.setdefault(segment.name, set()).add(row)
+
+    def _locate_postings(self):
+        # Built aside and swapped in, so readers never see a partial mapping
+        locations = {}
+        for segment in self._segments:
+            removed = self._removed.get(segment.name, ())
+            segment.live = np.ones(len(segment.ids), dtype=bool)
+            for row, job_id in enumerate(segment.ids):
+                if row in removed:
+                    segment.live[row] = False
+                    continue
+                # Later rows win, so an id added twice resolves to its newest copy
+                if job_id in locations:
+                    previous, previous_row = locations[job_id]
+                    previous.live[previous_row] = False
+                    self._remove_row(previous, previous_row)
+                locations[job_id] = (segment, row)
+        self._locations = locations
+        self._document_frequencies = None
+
+    def _idf(self):
+        if self._document_frequencies is None:
+            df = np.zeros(len(self._terms))
+            for segment in self._segments:
+                rows = segment.matrix[segment.live]
+                df += np.bincount(rows.indices, minlength=len(self._terms))
+            self._document_frequencies = df
+        # Smoothed idf, as in scikit-learn's TfidfTransformer
+        return np.log((1 + len(self._locations)) / (1 + self._document_frequencies)) + 1
+
+    def _query_vector(self, text):
+        counts = _term_counts(text)
+        columns = [self._vocabulary[term] for term in counts if term in self._vocabulary]
+        if not columns:
+            return None
+        weights = 1 + np.log([counts[self._terms[column]] for column in columns])
+        idf = self._idf()[columns]
+        query = np.zeros(len(self._terms))
+        query[columns] = weights * idf * idf / np.linalg.norm(weights * idf)
+        return query
+
+    def _row(self, text):
+        counts = _term_counts(text)
+        for term in counts:
+            if term not in self._vocabulary:
+                self._vocabulary[term] = len(self._terms)
+                self._terms.append(term)
+        columns = np.array(sorted(self._vocabulary[term] for term in counts), dtype=np.int32)
+        weights = np.array([1 + np.log(counts[self._terms[column]]) for column in columns], dtype=np.float32)
+        if len(weights):
+            weights /= np.linalg.norm(weights)
+        return columns, weights
+
+    def _new_segment_name(self):
+        # A crash after a segment's rename but before the manifest save leaves
+        # it on disk unlisted; its name is skipped rather than replaced
+        while True:
+            name = f"seg-{self._next_segment:06d}"
+            self._next_segment += 1
+            if not os.path.exists(os.path.join(self.path, name)):
+                return name
+
+    def _write_segment(self, postings, requirements):
+        name = self._new_segment_name()
+        tmp_path = tempfile.mkdtemp(dir=self.path, prefix='.tmp-')
+
+        rows = [self._row(text) for _, text in postings]
+        indptr = np.cumsum([0] + [len(columns) for columns, _ in rows], dtype=np.int64)
+        indices = np.concatenate([columns for columns, _ in rows]) if rows else np.array([], dtype=np.int32)
+        data = np.concatenate([weights for _, weights in rows]) if rows else np.array([], dtype=np.float32)
+        encoded = [text.encode('utf-8') for _, text in postings]
+        text_offsets = np.cumsum([0] + [len(text) for text in encoded], dtype=np.int64)
+
+        np.save(os.path.join(tmp_path, 'indptr.npy'), indptr)
+        np.save(os.path.join(tmp_path, 'indices.npy'), indices.astype(np.int32))
+        np.save(os.path.join(tmp_path, 'data.npy'), data.astype(np.float32))
+        np.save(os.path.join(tmp_path, 'text_offsets.npy'), text_offsets)
+        with open(os.path.join(tmp_path, 'texts.bin'), 'wb') as f:
+            f.write(b''.join(encoded))
+        _write_json(os.path.join(tmp_path, 'postings.json'),
+                    {'ids': [job_id for job_id, _ in postings], 'requirements': requirements})
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+        # The vocabulary is written before the manifest that refers to the new columns
+        _write_json(os.path.join(self.path, VOCABULARY), self._terms)
+        for segment in self._segments:
+            segment.resize(len(self._terms))
+        self._segments.append(_Segment(os.path.join(self.path, name), len(self._terms)))
+        self._locate_postings()
+
+    def _merge(self):
+        live = sorted(self._locations.items(), key=lambda item: (item[1][0].name, item[1][1]))
+        postings = [(job_id, segment.text(row)) for job_id, (segment, row) in live]
+        requirements = [segment.requirements[row] for _, (segment, row) in live]
+        old_segments = self._segments
+
+        self._segments = []
+        self._removed = {}
+        if postings:
+            self._write_segment(postings, requirements)
+        else:
+            self._locate_postings()
+        self._save_manifest()
+        for segment in old_segments:
+            shutil.rmtree(segment.path, ignore_errors=True)
+
+    def _save_manifest(self):
+        self._manifest = {
+            'segments': [segment.name for segment in self._segments],
+            'removed': {name: sorted(rows) for name, rows in self._removed.items() if rows},
+            'next_segment': self._next_segment,
+        }
+        _write_json(os.path.join(self.path, MANIFEST), self._manifest)
@@ -0,0 +1,231 @@
+"""Lightweight per-stage timing and memory metrics.
+
+Instrumented code wraps each stage in `span(name)` or decorates it with
+`timed(name)`. Nothing is recorded until metrics are enabled (enable() or
+JOBDONE_METRICS=1), and while disabled a span costs one flag check.
+Peak allocation per stage is measured with tracemalloc, which slows Python
+noticeably, so it is enabled separately (enable(memory=True) or
+JOBDONE_METRICS=memory). Peaks are process-wide, so with several threads
+they are an upper bound.
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_setting = os.getenv("JOBDONE_METRICS", "").lower()
+_enabled = _setting in ('1', 'true', 'memory')
+_track_memory = _setting == 'memory'
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.peak_bytes = 0
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_seconds': self.total_seconds,
+            'mean_seconds': self.total_seconds / self.calls if self.calls else 0.0,
+            'max_seconds': self.max_seconds,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._stages = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, peak_bytes=0, error=False):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+
+    def set_gauge(self, name, value):
+        """Record the current value of a level such as a queue depth."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            return {stage: stats.as_dict() for stage, stats in sorted(self._stages.items())}
+
+    def gauges(self):
+        with self._lock:
+            return dict(sorted(self._gauges.items()))
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._gauges.clear()
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        metrics = [
+            ('jobdone_stage_calls_total', 'counter', 'Calls per stage.', 'calls'),
+            ('jobdone_stage_errors_total', 'counter', 'Calls per stage that raised.', 'errors'),
+            ('jobdone_stage_seconds_total', 'counter', 'Wall time spent per stage.', 'total_seconds'),
+            ('jobdone_stage_seconds_max', 'gauge', 'Slowest single call per stage.', 'max_seconds'),
+            ('jobdone_stage_peak_bytes', 'gauge', 'Peak traced allocation per stage.', 'peak_bytes'),
+        ]
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, stats in snapshot.items():
+                lines.append(f'{name}{{stage="{stage}"}} {stats[field]}')
+        for gauge, value in self.gauges().items():
+            name = 'jobdone_' + gauge.replace('.', '_')
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+_local = threading.local()
+
+if _track_memory:
+    tracemalloc.start()
+
+
+def enable(memory=False):
+    global _enabled, _track_memory
+    _enabled = True
+    _track_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _track_memory
+    _enabled = False
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _track_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager recording wall time (and peak memory if tracked) for `name`."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _record_span(name)
+
+
+@contextmanager
+def _record_span(name):
+    tracking = _track_memory and tracemalloc.is_tracing()
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    if tracking:
+        current, peak = tracemalloc.get_traced_memory()
+        # Keep the enclosing span's peak so far; this span resets the counter
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, 0]
+        stack.append(frame)
+
+    error = False
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        peak_bytes = 0
+        if tracking:
+            stack.pop()
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            peak_bytes = max(peak - frame[0], 0)
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+        registry.record(name, seconds, peak_bytes, error)
+
+
+def timed(name):
+    """Decorator form of span(); the enabled check happens on every call."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _record_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_profiling():
+    """True inside profile() on this thread; work handed to other threads is not profiled."""
+    return getattr(_local, 'profiling', False)
+
+
+@contextmanager
+def profile(enabled=True, sort='cumulative', limit=30):
+    """Run the block under cProfile; yields a dict whose 'stats' is filled in at exit.
+
+    If JOBDONE_PROFILE_DIR is set the raw profile is also saved there for
+    snakeviz / pstats.
+    """
+    result = {'stats': None}
+    if not enabled:
+        yield result
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _local.profiling = True
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        _local.profiling = False
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        result['stats'] = out.getvalue()
+        profile_dir = os.getenv("JOBDONE_PROFILE_DIR")
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, f"request-{time.time():.0f}-{os.getpid()}.prof"))
@@ -1,29 +1,125 @@
-from groq import Groq
+from groq import AsyncGroq, Groq
 from dotenv import load_dotenv
 from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from io import BytesIO
+from dataclasses import dataclass
+from typing import Optional
+import asyncio
 import os
+import threading
+import time
+import weakref
+from jobdone.resume_generator.document_renderer import get_renderer
+from jobdone.resume_generator.response_cache import cache_key, response_cache
+from jobdone.resume_generator.scheduler import get_scheduler
+from jobdone.metrics import spans as metrics
+from jobdone.metrics.spans import span, timed
+
+MODEL = "mixtral-8x7b-32768"
+DEFAULT_TIMEOUT = 60.0
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+def _client_options():
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise Exception("GROQ API key not found")
+    # GROQ_BASE_URL points the client at another server, e.g. a local fake one.
+    # Retries are left to the shared RequestScheduler.
+    return {'api_key': api_key, 'base_url': os.getenv("GROQ_BASE_URL") or None, 'max_retries': 0}
+
+def get_client():
+    """Return the process-wide Groq client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _clients_lock:
+            if _client is None:
+                _client = Groq(**_client_options())
+    return _client
+
+def get_async_client():
+    """Return the AsyncGroq client for the running event loop.
+
+    Async connection pools are bound to the loop that opened them, so there
+    is one client per loop rather than one per process.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = AsyncGroq(**_client_options())
+            _async_clients[loop] = client
+    return client
+
+@dataclass(frozen=True)
+class GeneratedContent:
+    text: str
+    # True when generation failed and `text` is the original resume
+    fallback: bool = False
+    error: Optional[str] = None
 
 class ResumeGenerator:
-    def __init__(self):
-        self.document = None
-        load_dotenv()
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise Exception("GROQ API key not found")
-        self.client = Groq(api_key=self.api_key)
+    def __init__(self, client=None, async_client=None, timeout=DEFAULT_TIMEOUT, cache=response_cache,
+                 renderer=None, scheduler=None):
+        self.client = client or get_client()
+        self.async_client = async_client
+        self.timeout = timeout
+        # Pass cache=None to always call the API
+        self.cache = cache
+        # Shares the process-wide template unless a renderer is given
+        self.renderer = renderer or get_renderer()
+        # Rate limit, in-flight cap and retries shared by every generator in the process
+        self.scheduler = scheduler or get_scheduler()
 
     def generate(self, resume_text, job_desc_text):
-        # First, generate optimized content using AI
-        optimized_content = self._generate_optimized_content(resume_text, job_desc_text)
+        # First, generate optimized content using AI (the original text if that fails)
+        optimized_content = self.generate_content(resume_text, job_desc_text).text
         
         # Then, create a properly formatted Word document
         return self._create_document(optimized_content)
 
-    def _generate_optimized_content(self, resume_text, job_desc_text):
-        """Generate AI-optimized content for the resume."""
+    def generate_content(self, resume_text, job_desc_text):
+        """Optimized text as a GeneratedContent that says whether it fell back to the original."""
+        try:
+            return GeneratedContent(self._generate_optimized_content(resume_text, job_desc_text))
+        except Exception as e:
+            return self._fallback(resume_text, e)
+
+    def create_document(self, optimized_content):
+        """Build the Word document for content that was already generated."""
+        return self._create_document(optimized_content)
+
+    def create_documents(self, contents):
+        """Build Word documents for many generated resumes from the one loaded template."""
+        return [self._create_document(content) for content in contents]
+
+    async def agenerate(self, resume_text, job_desc_text):
+        """Async counterpart of generate() built on the streaming completion."""
+        content = await self.agenerate_content(resume_text, job_desc_text)
+        return await asyncio.to_thread(self._create_document, content.text)
+
+    async def agenerate_content(self, resume_text, job_desc_text):
+        """Async counterpart of generate_content()."""
+        try:
+            tokens = [token async for token in self.astream_optimized_content(resume_text, job_desc_text)]
+            return GeneratedContent(''.join(tokens).strip())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return self._fallback(resume_text, e)
+
+    def _fallback(self, resume_text, error):
+        # Reported, not silent: logged, counted as a stage error and returned flagged
+        message = f"{type(error).__name__}: {str(error)}"
+        print(f"AI generation failed, falling back to the original resume: {message}")
+        if metrics.is_enabled():
+            metrics.registry.record('generator.fallback', 0.0, error=True)
+        return GeneratedContent(resume_text, fallback=True, error=message)
+
+    def _build_messages(self, resume_text, job_desc_text):
         prompt = f"""
         You are a professional resume writer. Create an optimized version of this resume to better match the job description.
         
@@ -44,60 +140,169 @@ class ResumeGenerator:
         
         Return only the optimized resume text.
         """
+        return [
+            {"role": "system", "content": "You are a professional resume writer."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _sampling_params(self):
+        return {'temperature': 0.7, 'max_tokens': 2048, 'top_p': 1}
+
+    def _completion_params(self, resume_text, job_desc_text, deadline=None):
+        # With a deadline the HTTP timeout is whatever is left of it
+        timeout = self.timeout if deadline is None else max(deadline - time.monotonic(), 0)
+        return {
+            'model': MODEL,
+            'messages': self._build_messages(resume_text, job_desc_text),
+            'timeout': timeout,
+            **self._sampling_params(),
+        }
+
+    def _cache_key(self, resume_text, job_desc_text):
+        return cache_key(resume_text, job_desc_text, MODEL, self._sampling_params())
 
+    def _generate_optimized_content(self, resume_text, job_desc_text):
+        """Generate AI-optimized content for the resume; errors propagate."""
+        if self.cache is None:
+            return self._request_completion(resume_text, job_desc_text)
+        return self.cache.get_or_compute(
+            self._cache_key(resume_text, job_desc_text),
+            lambda: self._request_completion(resume_text, job_desc_text),
+            timeout=self.timeout
+        )
+
+    @timed('generator.completion')
+    def _request_completion(self, resume_text, job_desc_text):
+        # The timeout bounds the whole call: queueing, rate limiting and retries too
+        deadline = time.monotonic() + self.timeout
+        completion = self.scheduler.run(lambda: self.client.chat.completions.create(
+            stream=False,
+            **self._completion_params(resume_text, job_desc_text, deadline)
+        ), deadline)
+        
+        return completion.choices[0].message.content.strip()
+
+    def stream_optimized_content(self, resume_text, job_desc_text):
+        """Yield the optimized resume text token by token as it arrives.
+
+        A cached response is yielded as a single chunk, and a request that is
+        already in flight for the same inputs is waited on rather than
+        repeated. Errors propagate to the caller. Closing the generator early
+        closes the underlying HTTP response.
+        """
+        if self.cache is None:
+            yield from self._stream_completion(resume_text, job_desc_text)
+            return
+
+        key = self._cache_key(resume_text, job_desc_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        future, is_leader = self.cache.claim(key)
+        if not is_leader:
+            # Bounded, so a leader whose stream was abandoned cannot hang its followers
+            yield future.result(timeout=self.timeout)
+            return
+
+        tokens = []
         try:
-            completion = self.client.chat.completions.create(
-                model="mixtral-8x7b-32768",
-                messages=[
-                    {"role": "system", "content": "You are a professional resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2048,
-                top_p=1,
-                stream=False
-            )
-            
-            return completion.choices[0].message.content.strip()
+            for token in self._stream_completion(resume_text, job_desc_text):
+                tokens.append(token)
+                yield token
+        except BaseException as e:
+            self.cache.fail(key, e if isinstance(e, Exception) else Exception("Resume generation was interrupted"))
+            raise
+        self.cache.resolve(key, ''.join(tokens).strip())
 
-        except Exception as e:
-            print(f"AI generation failed: {str(e)}")
-            return resume_text  # Fallback to original text if AI fails
+    def _stream_completion(self, resume_text, job_desc_text):
+        deadline = time.monotonic() + self.timeout
+        open_stream = lambda: self.client.chat.completions.create(
+            stream=True,
+            **self._completion_params(resume_text, job_desc_text, deadline)
+        )
+        # The scheduler slot stays taken until the stream is closed
+        with self.scheduler.request(open_stream, deadline) as stream, span('generator.stream'), stream:
+            for chunk in stream:
+                # The HTTP timeout bounds each read, not a slowly dripping stream
+                if time.monotonic() > deadline:
+                    raise asyncio.TimeoutError("Resume generation timed out")
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def astream_optimized_content(self, resume_text, job_desc_text, timeout=None):
+        """Async generator of tokens with an overall deadline.
 
+        `timeout` bounds the whole completion (defaults to self.timeout) and
+        raises asyncio.TimeoutError once exceeded. Cancelling the consuming
+        task or closing the generator closes the HTTP response. Caching and
+        in-flight deduplication work as in stream_optimized_content.
+        """
+        if self.cache is None:
+            async for token in self._astream_completion(resume_text, job_desc_text, timeout):
+                yield token
+            return
+
+        key = self._cache_key(resume_text, job_desc_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        future, is_leader = self.cache.claim(key)
+        if not is_leader:
+            yield await asyncio.wait_for(asyncio.wrap_future(future),
+                                         timeout if timeout is not None else self.timeout)
+            return
+
+        tokens = []
+        try:
+            async for token in self._astream_completion(resume_text, job_desc_text, timeout):
+                tokens.append(token)
+                yield token
+        except BaseException as e:
+            self.cache.fail(key, e if isinstance(e, Exception) else Exception("Resume generation was interrupted"))
+            raise
+        self.cache.resolve(key, ''.join(tokens).strip())
+
+    async def _astream_completion(self, resume_text, job_desc_text, timeout):
+        client = self.async_client or get_async_client()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+
+        open_stream = lambda: asyncio.wait_for(
+            client.chat.completions.create(stream=True, **self._completion_params(resume_text, job_desc_text)),
+            max(deadline - loop.time(), 0)
+        )
+        # Spans are thread-local, so async streams record their time directly
+        start = loop.time()
+        error = False
+        try:
+            async with self.scheduler.arequest(open_stream, deadline) as stream, stream:
+                chunks = stream.__aiter__()
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("Resume generation timed out")
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except BaseException:
+            error = True
+            raise
+        finally:
+            if metrics.is_enabled():
+                metrics.registry.record('generator.astream', loop.time() - start, error=error)
+
+    @timed('generator.document')
     def _create_document(self, content):
         """Create a properly formatted Word document."""
-        self.document = Document()
-        
         try:
-            # Set up document formatting
-            sections = self.document.sections
-            for section in sections:
-                section.page_width = Inches(8.5)
-                section.page_height = Inches(11)
-                section.left_margin = Inches(1)
-                section.right_margin = Inches(1)
-                section.top_margin = Inches(1)
-                section.bottom_margin = Inches(1)
-            
-            # Add content with formatting
-            title = self.document.add_heading('Optimized Resume', 0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Add content with proper formatting
-            paragraphs = content.split('\n\n')
-            for para in paragraphs:
-                if para.strip():
-                    p = self.document.add_paragraph()
-                    p.add_run(para.strip())
-                    p.space_after = Pt(12)
-            
-            # Save to BytesIO
-            doc_buffer = BytesIO()
-            self.document.save(doc_buffer)
-            doc_buffer.seek(0)
-            
-            return doc_buffer.getvalue()
-            
+            return self.renderer.render(content)
         except Exception as e:
             print(f"Document creation failed: {str(e)}")
             return self._generate_basic_document(content)
@@ -0,0 +1,185 @@
+"""Template-based rendering of optimized resumes to Word documents.
+
+The template (a .docx file, or a default one built in memory with the page
+geometry and styles) is parsed once per renderer and thread and reused: each
+render appends to it, saves, and removes what it appended. The generated
+text is split into sections on recognised headings (Summary, Experience,
+Skills, Education, ...), each rendered as a styled block; text without any
+recognised heading falls back to one paragraph per blank-line separated
+block.
+"""
+import os
+import re
+import threading
+from io import BytesIO
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Pt
+
+# Heading text (lowercased) -> section kind
+SECTION_HEADINGS = {
+    'summary': 'summary',
+    'professional summary': 'summary',
+    'profile': 'summary',
+    'objective': 'summary',
+    'experience': 'experience',
+    'work experience': 'experience',
+    'professional experience': 'experience',
+    'employment history': 'experience',
+    'projects': 'experience',
+    'skills': 'skills',
+    'technical skills': 'skills',
+    'core competencies': 'skills',
+    'education': 'education',
+    'certifications': 'education',
+}
+
+# "## Skills", "**SKILLS:**", "Work Experience:" and the like
+HEADING_PATTERN = re.compile(r'^\s*(?:#+\s*)?(?:\*\*)?\s*([A-Za-z ]+?)\s*:?\s*(?:\*\*)?\s*:?\s*$')
+BULLET_PATTERN = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+BOLD_PATTERN = re.compile(r'\*\*(.+?)\*\*')
+
+def _section_kind(line):
+    match = HEADING_PATTERN.match(line)
+    if match:
+        return SECTION_HEADINGS.get(match.group(1).lower())
+    return None
+
+
+def split_sections(content):
+    """Split generated text into (kind, heading, lines); kind is None for the preamble."""
+    sections = []
+    kind, heading, lines = None, None, []
+    for line in content.splitlines():
+        section = _section_kind(line)
+        if section:
+            if lines or heading:
+                sections.append((kind, heading, lines))
+            kind, heading, lines = section, HEADING_PATTERN.match(line).group(1).strip(), []
+        else:
+            lines.append(line.rstrip())
+    if lines or heading:
+        sections.append((kind, heading, lines))
+    return sections
+
+
+def _build_default_template():
+    document = Document()
+    for section in document.sections:
+        section.page_width = Inches(8.5)
+        section.page_height = Inches(11)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+    document.styles['Normal'].paragraph_format.space_after = Pt(6)
+    document.styles['Heading 1'].paragraph_format.space_before = Pt(12)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class DocumentRenderer:
+    def __init__(self, template_path=None, title='Optimized Resume'):
+        # The template must provide the Title, Heading 1 and List Bullet styles
+        if template_path:
+            with open(template_path, 'rb') as f:
+                self._template = f.read()
+        else:
+            self._template = _build_default_template()
+        self.title = title
+        # Looking styles up by name scans styles.xml on every paragraph, so the
+        # ids are resolved once here and set directly on each paragraph
+        styles = Document(BytesIO(self._template)).styles
+        self._style_ids = {name: styles[name].style_id for name in ('Title', 'Heading 1', 'List Bullet')}
+        self._local = threading.local()
+
+    def _loaded_template(self):
+        # One parsed template per thread; render() removes what it added, so
+        # the template is parsed once rather than once per resume
+        loaded = getattr(self._local, 'template', None)
+        if loaded is None:
+            document = Document(BytesIO(self._template))
+            loaded = self._local.template = (document, set(document.element.body))
+        return loaded
+
+    def render(self, content):
+        """Render one resume's text to .docx bytes."""
+        document, template_elements = self._loaded_template()
+        try:
+            title = self._add_paragraph(document, 'Title', self.title)
+            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+            sections = split_sections(content)
+            if not any(kind for kind, _, _ in sections):
+                self._add_paragraphs(document, content)
+            else:
+                for kind, heading, lines in sections:
+                    self._add_section(document, kind, heading, lines)
+
+            buffer = BytesIO()
+            document.save(buffer)
+            return buffer.getvalue()
+        finally:
+            body = document.element.body
+            for element in list(body):
+                if element not in template_elements:
+                    body.remove(element)
+
+    def render_many(self, contents):
+        """Render many resumes from the same template, in order."""
+        return [self.render(content) for content in contents]
+
+    def _add_paragraph(self, document, style=None, text=None, bold=False):
+        paragraph = document.add_paragraph()
+        if style:
+            paragraph._p.style = self._style_ids[style]
+        if text:
+            self._add_text(paragraph, text, bold)
+        return paragraph
+
+    def _add_paragraphs(self, document, content):
+        for block in content.split('\n\n'):
+            if block.strip():
+                self._add_paragraph(document, text=block.strip())
+
+    def _add_section(self, document, kind, heading, lines):
+        if kind is None:
+            # Name and contact details before the first heading
+            for line in filter(str.strip, lines):
+                paragraph = self._add_paragraph(document, text=line.strip())
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            return
+
+        self._add_paragraph(document, 'Heading 1', heading.title())
+        for line in filter(str.strip, lines):
+            if BULLET_PATTERN.match(line):
+                self._add_paragraph(document, 'List Bullet', BULLET_PATTERN.sub('', line).strip())
+            elif kind == 'experience' and not line.rstrip().endswith('.'):
+                # Role, company and dates lines head each entry; sentences stay plain
+                self._add_paragraph(document, text=line.strip(), bold=True)
+            else:
+                self._add_paragraph(document, text=line.strip())
+
+    def _add_text(self, paragraph, text, bold=False):
+        # **bold** markers from the model become bold runs
+        for i, part in enumerate(BOLD_PATTERN.split(text)):
+            if part:
+                run = paragraph.add_run(part)
+                if bold or i % 2 == 1:
+                    run.bold = True
+        return paragraph
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Return the process-wide renderer; JOBDONE_RESUME_TEMPLATE selects a .docx template."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = DocumentRenderer(os.getenv("JOBDONE_RESUME_TEMPLATE"))
+    return _renderer
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def cache_key(resume_text, job_desc_text, model, params):
+    """Key for one completion: normalized input hashes, model and sampling parameters."""
+    resume_hash = hashlib.sha256(_normalize(resume_text).encode('utf-8')).hexdigest()
+    job_hash = hashlib.sha256(_normalize(job_desc_text).encode('utf-8')).hexdigest()
+    return f"{model}:{json.dumps(params, sort_keys=True)}:{resume_hash}:{job_hash}"
+
+
+class MemoryBackend:
+    """Per-process LRU of (value, stored_at) pairs."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, ttl):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            if time.time() - stored_at > ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class SQLiteBackend:
+    """Cache stored in a local SQLite file so every worker on the host shares it."""
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _connect(self):
+        # sqlite3 connections may not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND stored_at >= ?", (key, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            # Trim least recently used rows once over the size bound
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """TTL cache of generated resumes that also deduplicates in-flight requests.
+
+    The first caller for a key becomes the leader and performs the upstream
+    call; concurrent callers with the same key wait for its result instead
+    of issuing their own.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.backend.get(key, self.ttl)
+
+    def put(self, key, value):
+        self.backend.put(key, value)
+
+    def claim(self, key):
+        """Return (future, is_leader) for `key`; the leader must resolve or fail it."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            # A running future cannot be cancelled by a waiter giving up
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            return future, True
+
+    def resolve(self, key, value):
+        self.put(key, value)
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def fail(self, key, error):
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """Cached value for `key`, else compute() once however many callers ask.
+
+        Followers wait at most `timeout` seconds for the leader, then raise
+        TimeoutError; None waits indefinitely.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        future, is_leader = self.claim(key)
+        if not is_leader:
+            return future.result(timeout)
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.resolve(key, value)
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _default_backend():
+    path = os.getenv("JOBDONE_RESPONSE_CACHE_PATH")
+    if path:
+        return SQLiteBackend(path)
+    return MemoryBackend()
+
+
+response_cache = ResponseCache(_default_backend())
@@ -0,0 +1,267 @@
+"""Shared request scheduler for the generation backend.
+
+Every completion call goes through one process-wide RequestScheduler:
+
+- a token bucket spaces requests out to `rate` per second, allowing bursts
+  of up to `burst`;
+- at most `max_in_flight` requests (streams included, until closed) are
+  open at once;
+- throttling (429), server errors and connection failures are retried up to
+  `max_retries` times with full-jitter exponential backoff, honouring a
+  Retry-After header when the server sends one.
+
+The Groq clients are created with their own retries disabled so the two
+layers do not multiply. Queue depth and in-flight count are published as
+metrics gauges, and queue wait, request latency, retries and give-ups as
+stages. Settings come from JOBDONE_GROQ_RATE, JOBDONE_GROQ_BURST,
+JOBDONE_GROQ_MAX_IN_FLIGHT and JOBDONE_GROQ_MAX_RETRIES.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from groq import APIConnectionError, APIStatusError, APITimeoutError
+from jobdone.metrics import spans as metrics
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long to wait for the token."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """Take a token and return the wait for it, or None if that would exceed `max_wait`.
+
+        A caller that would give up is not charged, so the debt only covers
+        callers that are going to wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go negative: later callers queue behind earlier ones
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class RequestScheduler:
+    def __init__(self, rate=0.5, burst=5, max_in_flight=4, max_retries=3, base_delay=0.5, max_delay=20.0):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.retries = 0
+        self.failures = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'in_flight': self.in_flight,
+                'retries': self.retries,
+                'failures': self.failures,
+            }
+
+    def run(self, func, deadline=None):
+        """Call `func` under the limits, retrying transient failures.
+
+        `deadline` (time.monotonic() time) bounds the wait for a slot, the
+        rate limiter and retries; past it asyncio.TimeoutError is raised.
+        """
+        with self.request(func, deadline) as result:
+            return result
+
+    @contextmanager
+    def request(self, func, deadline=None):
+        """Like run(), but the in-flight slot is held until the block exits (for streams)."""
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            start = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                self._release(start, error=True)
+                delay = self._backoff(e, attempt)
+                attempt += 1
+                self._check_deadline(time.monotonic(), deadline, delay)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._release(start, error=True)
+                raise
+            try:
+                yield result
+            finally:
+                self._release(start)
+            return
+
+    async def arun(self, func, deadline=None):
+        async with self.arequest(func, deadline) as result:
+            return result
+
+    @asynccontextmanager
+    async def arequest(self, func, deadline=None):
+        """Async request(); `func` returns an awaitable, `deadline` is in loop time."""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await self._aacquire(loop, deadline)
+            start = time.monotonic()
+            try:
+                result = await func()
+            except Exception as e:
+                self._release(start, error=True)
+                delay = self._backoff(e, attempt)
+                attempt += 1
+                self._check_deadline(loop.time(), deadline, delay)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release(start, error=True)
+                raise
+            try:
+                yield result
+            finally:
+                self._release(start)
+            return
+
+    def _acquire(self, deadline):
+        queued_at = self._enter_queue()
+        acquired = False
+        try:
+            acquired = self._slots.acquire(timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+            if not acquired:
+                raise asyncio.TimeoutError("Resume generation timed out waiting for an in-flight slot")
+            time.sleep(self._reserve(time.monotonic(), deadline))
+        except BaseException:
+            if acquired:
+                self._slots.release()
+            self._leave_queue(queued_at, admitted=False)
+            raise
+        self._leave_queue(queued_at, admitted=True)
+
+    async def _aacquire(self, loop, deadline):
+        queued_at = self._enter_queue()
+        acquired = False
+        try:
+            # The slots are shared with threads, so poll rather than block the loop
+            while not self._slots.acquire(blocking=False):
+                self._check_deadline(loop.time(), deadline, 0.0)
+                await asyncio.sleep(0.05)
+            acquired = True
+            await asyncio.sleep(self._reserve(loop.time(), deadline))
+        except BaseException:
+            if acquired:
+                self._slots.release()
+            self._leave_queue(queued_at, admitted=False)
+            raise
+        self._leave_queue(queued_at, admitted=True)
+
+    def _reserve(self, now, deadline):
+        wait = self.bucket.reserve(None if deadline is None else deadline - now)
+        if wait is None:
+            raise asyncio.TimeoutError("Resume generation timed out waiting for the rate limiter")
+        return wait
+
+    def _check_deadline(self, now, deadline, wait):
+        if deadline is not None and now + wait > deadline:
+            raise asyncio.TimeoutError("Resume generation timed out waiting for the rate limiter")
+
+    def _backoff(self, error, attempt):
+        """Delay before retrying `error`, or re-raise it if it is not worth retrying."""
+        if not is_retryable(error) or attempt >= self.max_retries:
+            with self._lock:
+                self.failures += 1
+            if metrics.is_enabled():
+                metrics.registry.record('scheduler.gave_up', 0.0, error=True)
+            raise error
+        with self._lock:
+            self.retries += 1
+        if metrics.is_enabled():
+            metrics.registry.record('scheduler.retry', 0.0)
+        # Full jitter spreads out clients that were throttled at the same moment
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _enter_queue(self):
+        with self._lock:
+            self.queued += 1
+            queued = self.queued
+        if metrics.is_enabled():
+            metrics.registry.set_gauge('scheduler.queue_depth', queued)
+        return time.monotonic()
+
+    def _leave_queue(self, queued_at, admitted):
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += int(admitted)
+            queued, in_flight = self.queued, self.in_flight
+        if metrics.is_enabled():
+            metrics.registry.set_gauge('scheduler.queue_depth', queued)
+            metrics.registry.set_gauge('scheduler.in_flight', in_flight)
+            metrics.registry.record('scheduler.queue_wait', time.monotonic() - queued_at, error=not admitted)
+
+    def _release(self, start, error=False):
+        with self._lock:
+            self.in_flight -= 1
+            in_flight = self.in_flight
+        self._slots.release()
+        if metrics.is_enabled():
+            metrics.registry.set_gauge('scheduler.in_flight', in_flight)
+            metrics.registry.record('scheduler.request', time.monotonic() - start, error=error)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, configured from the environment on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler(
+                    rate=float(os.getenv("JOBDONE_GROQ_RATE", "0.5")),
+                    burst=int(os.getenv("JOBDONE_GROQ_BURST", "5")),
+                    max_in_flight=int(os.getenv("JOBDONE_GROQ_MAX_IN_FLIGHT", "4")),
+                    max_retries=int(os.getenv("JOBDONE_GROQ_MAX_RETRIES", "3")),
+                )
+    return _scheduler
@@ -0,0 +1,230 @@
+"""Asynchronous HTTP analysis service.
+
+    jobdone serve [--host 0.0.0.0] [--port 8080] [--workers N]
+
+Endpoints:
+    GET  /health     liveness; always 200 while the event loop is running
+    GET  /ready      200 once every worker has loaded its models, else 503
+                     (with "error" set if the workers failed to start)
+    POST /score      {"resume": text, "job_description": text} -> score and requirement report
+    POST /keywords   {"resume": text, "job_description": text} -> found/missing keywords
+    POST /extract    raw file bytes (?filename= optional) -> {"text": ...}
+    POST /generate   {"resume": text, "job_description": text} -> optimized DOCX
+                     (X-Generation-Fallback: true if it holds the original
+                     resume), or streamed plain text with ?format=text;
+                     502/504 if generation fails before the first token, and
+                     if it fails later an "X-Generation-Fallback: <error>"
+                     line followed by the original resume ends the stream
+
+CPU-bound NLP and extraction run on a process pool whose workers load the
+models at start-up; generation is I/O-bound and stays on the event loop.
+Bodies over `max_body_bytes` get 413, and once `max_pending` requests are
+admitted further ones get 503 with Retry-After instead of queueing without
+bound.
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import web
+from jobdone.analyzers.nlp import DEFAULT_MODEL, init_worker, worker_analyzers
+from jobdone.metrics import spans as metrics
+
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+# Starts the line that replaces the rest of a text stream whose generation failed
+FALLBACK_MARKER = 'X-Generation-Fallback:'
+
+
+def _error_message(error):
+    return f"{type(error).__name__}: {str(error)}".replace('\n', ' ')[:200]
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _score(resume_text, job_desc_text):
+    score, report = worker_analyzers['score_calculator'].score_with_report(resume_text, job_desc_text)
+    return {'score': score, 'requirements': report}
+
+
+def _keywords(resume_text, job_desc_text):
+    return worker_analyzers['keyword_matcher'].find_matches(resume_text, job_desc_text)
+
+
+def _extract(data, filename):
+    from jobdone.file_processor.registry import extract
+    file = io.BytesIO(data)
+    if filename:
+        file.name = filename
+    return extract(file)
+
+
+class AnalysisService:
+    def __init__(self, workers=None, model=None, max_pending=None, max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+                 generator=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.model = model or DEFAULT_MODEL
+        # Admitted requests beyond the workers wait in the pool's queue, up to this cap
+        self.max_pending = max_pending or self.workers * 4
+        self.max_body_bytes = max_body_bytes
+        self.generator = generator
+        self.executor = None
+        self.ready = False
+        # Set when the workers could not start; the service then never becomes ready
+        self.warm_up_error = None
+        self.pending = 0
+
+    def create_app(self):
+        app = web.Application(client_max_size=self.max_body_bytes, middlewares=[self._admission])
+        app.router.add_get('/health', self.health)
+        app.router.add_get('/ready', self.readiness)
+        app.router.add_post('/score', self.score)
+        app.router.add_post('/keywords', self.keywords)
+        app.router.add_post('/extract', self.extract)
+        app.router.add_post('/generate', self.generate)
+        app.on_startup.append(self._start)
+        app.on_cleanup.append(self._stop)
+        return app
+
+    async def _start(self, app):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.model,))
+        # Warm up in the background so /health answers while models load
+        app['warm_up'] = asyncio.create_task(self._warm_up())
+        app['warm_up'].add_done_callback(self._warm_up_done)
+
+    async def _warm_up(self):
+        loop = asyncio.get_running_loop()
+        # A worker takes tasks only once its models are loaded, and one that
+        # loads first may take several, so ask until every worker has answered
+        pids = set()
+        while True:
+            tasks = [loop.run_in_executor(self.executor, _warm_up) for _ in range(self.workers - len(pids))]
+            pids.update(await asyncio.gather(*tasks))
+            if len(pids) >= self.workers:
+                break
+            await asyncio.sleep(0.1)
+        self.ready = True
+
+    def _warm_up_done(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        self.warm_up_error = _error_message(task.exception())
+        print(f"Analysis workers failed to start: {self.warm_up_error}")
+
+    async def _stop(self, app):
+        app['warm_up'].cancel()
+        self.ready = False
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @web.middleware
+    async def _admission(self, request, handler):
+        if request.method != 'POST':
+            return await handler(request)
+        if self.warm_up_error:
+            raise web.HTTPServiceUnavailable(text=f"Analysis workers failed to start: {self.warm_up_error}")
+        if not self.ready:
+            raise web.HTTPServiceUnavailable(text='Models are still loading', headers={'Retry-After': '5'})
+        if self.pending >= self.max_pending:
+            raise web.HTTPServiceUnavailable(text='Too many requests in progress', headers={'Retry-After': '1'})
+        self.pending += 1
+        try:
+            return await handler(request)
+        finally:
+            self.pending -= 1
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _texts(self, request):
+        try:
+            body = await request.json()
+            resume_text, job_desc_text = body['resume'], body['job_description']
+        except (ValueError, TypeError, KeyError):
+            raise web.HTTPBadRequest(text='Expected a JSON object with "resume" and "job_description"')
+        if not isinstance(resume_text, str) or not isinstance(job_desc_text, str):
+            raise web.HTTPBadRequest(text='"resume" and "job_description" must be strings')
+        return resume_text, job_desc_text
+
+    async def health(self, request):
+        return web.json_response({'status': 'ok'})
+
+    async def readiness(self, request):
+        status = {'ready': self.ready, 'workers': self.workers, 'pending': self.pending,
+                  'max_pending': self.max_pending}
+        if self.warm_up_error:
+            status['error'] = self.warm_up_error
+        return web.json_response(status, status=200 if self.ready else 503)
+
+    async def score(self, request):
+        return web.json_response(await self._run(_score, *await self._texts(request)))
+
+    async def keywords(self, request):
+        return web.json_response(await self._run(_keywords, *await self._texts(request)))
+
+    async def extract(self, request):
+        data = await request.read()
+        if not data:
+            raise web.HTTPBadRequest(text='Expected the file contents as the request body')
+        try:
+            text = await self._run(_extract, data, request.query.get('filename'))
+        except Exception as e:
+            raise web.HTTPUnprocessableEntity(text=str(e))
+        return web.json_response({'text': text})
+
+    async def generate(self, request):
+        resume_text, job_desc_text = await self._texts(request)
+        if self.generator is None:
+            from jobdone.resume_generator.ai_generator import ResumeGenerator
+            self.generator = ResumeGenerator()
+
+        if request.query.get('format') == 'text':
+            return await self._stream_text(request, resume_text, job_desc_text)
+
+        content = await self.generator.agenerate_content(resume_text, job_desc_text)
+        document = await asyncio.to_thread(self.generator.create_document, content.text)
+        headers = {'Content-Disposition': 'attachment; filename="optimized_resume.docx"'}
+        if content.fallback:
+            # The document holds the original resume; say so rather than pass it off as optimized
+            headers['X-Generation-Fallback'] = 'true'
+            headers['X-Generation-Error'] = content.error.replace('\n', ' ')[:200]
+        return web.Response(body=document, content_type=DOCX_CONTENT_TYPE, headers=headers)
+
+    async def _stream_text(self, request, resume_text, job_desc_text):
+        chunks = self.generator.astream_optimized_content(resume_text, job_desc_text)
+        try:
+            # Wait for the first chunk before sending the status, so a failed
+            # or timed-out upstream request gets an error status, not a 200
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = ''
+            except asyncio.TimeoutError as e:
+                raise web.HTTPGatewayTimeout(text=_error_message(e), headers={'X-Generation-Error': _error_message(e)})
+            except Exception as e:
+                raise web.HTTPBadGateway(text=_error_message(e), headers={'X-Generation-Error': _error_message(e)})
+
+            response = web.StreamResponse(headers={'Content-Type': 'text/plain; charset=utf-8'})
+            await response.prepare(request)
+            await response.write(first.encode('utf-8'))
+            try:
+                async for chunk in chunks:
+                    await response.write(chunk.encode('utf-8'))
+            except Exception as e:
+                # The status is already sent: mark the break in the body and
+                # follow it with the original resume, as the DOCX fallback does
+                print(f"AI generation failed mid-stream, falling back to the original resume: {_error_message(e)}")
+                if metrics.is_enabled():
+                    metrics.registry.record('generator.fallback', 0.0, error=True)
+                await response.write(f"\n{FALLBACK_MARKER} {_error_message(e)}\n{resume_text}".encode('utf-8'))
+        finally:
+            # Closes the upstream response if the client went away mid-stream
+            await chunks.aclose()
+        await response.write_eof()
+        return response
+
+
+def serve(host='0.0.0.0', port=8080, **options):
+    web.run_app(AnalysisService(**options).create_app(), host=host, port=port)
@@ -1,13 +1,36 @@
-from setuptools import setup, find_packages
+from setuptools import setup
+
+# The repository root is the `jobdone` package; its subpackages have no
+# __init__.py files, so they are listed rather than discovered
+SUBPACKAGES = [
+    "analyzers",
+    "app",
+    "batch",
+    "benchmarks",
+    "file_processor",
+    "job_index",
+    "metrics",
+    "resume_generator",
+    "service",
+    "testing",
+]
 
 setup(
     name="jobdone",
     version="1.0.0",
-    packages=find_packages(),
+    package_dir={"jobdone": "."},
+    packages=["jobdone"] + [f"jobdone.{name}" for name in SUBPACKAGES],
+    package_data={
+        "jobdone.analyzers": ["data/skills.txt"],
+        "jobdone.app": ["static/css/*.css"],
+    },
     include_package_data=True,
     install_requires=[
         line.strip()
         for line in open("requirements.txt")
         if not line.startswith("#")
     ],
-) 
\ No newline at end of file
+    entry_points={
+        "console_scripts": ["jobdone=jobdone.cli:main"],
+    },
+)
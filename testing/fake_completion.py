@@ -0,0 +1,138 @@
+"""In-process fake of the OpenAI-compatible chat completions API.
+
+The Groq client is pointed at it through GROQ_BASE_URL. Every POST is
+answered as a chat completion, streamed as server-sent events when the
+request asks for a stream. A `throttle` fraction of requests gets 429 with
+Retry-After and a `fail` fraction gets 500. `latency` delays the response
+headers and `chunk_delay` spaces out the streamed tokens. The server counts
+requests, how many were open at once, and streams the client closed early.
+
+    with FakeCompletionServer(chunk_delay=0.05) as server:
+        os.environ['GROQ_BASE_URL'] = server.url
+        ...
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEXT = "Summary\nOptimized resume text."
+
+
+class FakeCompletionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, throttle=0.0, fail=0.0, latency=0.1, chunk_delay=0.0, text=DEFAULT_TEXT, seed=0):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.throttle = throttle
+        self.fail = fail
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.text = text
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'throttled': 0, 'failed': 0, 'max_open': 0, 'completed': 0,
+                       'disconnected': 0}
+        self._open = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def open_requests(self):
+        with self.lock:
+            return self._open
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.counts['requests'] += 1
+            server._open += 1
+            server.counts['max_open'] = max(server.counts['max_open'], server._open)
+            roll = server.rng.random()
+        try:
+            if roll < server.throttle:
+                server.count('throttled')
+                return self._error(429, 'Rate limit reached', {'Retry-After': '0.5'})
+            if roll < server.throttle + server.fail:
+                server.count('failed')
+                return self._error(500, 'Internal error', {})
+            time.sleep(server.latency)
+            self._complete(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the response before it was finished
+            server.count('disconnected')
+            self.close_connection = True
+        finally:
+            with server.lock:
+                server._open -= 1
+
+    def _error(self, status, message, headers):
+        out = json.dumps({'error': {'message': message, 'type': 'fake'}}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _complete(self, body):
+        server = self.server
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            tokens = server.text.split(' ')
+            for i, token in enumerate(tokens):
+                content = token if i == len(tokens) - 1 else token + ' '
+                chunk = {'id': 'fake', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'],
+                         'choices': [{'index': 0, 'delta': {'content': content}, 'finish_reason': None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(server.chunk_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            server.count('completed')
+            return
+        out = json.dumps({
+            'id': 'fake', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': server.text},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+        server.count('completed')
@@ -0,0 +1,24 @@
+import pytest
+
+from jobdone.resume_generator import ai_generator
+from jobdone.testing.fake_completion import FakeCompletionServer
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Start a fake completion server with the given options and point the Groq clients at it."""
+    servers = []
+
+    def start(**options):
+        options.setdefault('latency', 0.0)
+        server = FakeCompletionServer(**options).start()
+        servers.append(server)
+        monkeypatch.setenv('GROQ_BASE_URL', server.url)
+        monkeypatch.setenv('GROQ_API_KEY', 'fake')
+        # The process-wide client would otherwise keep the first server's URL
+        monkeypatch.setattr(ai_generator, '_client', None)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,194 @@
+"""ResumeGenerator against the in-process fake completion server."""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jobdone.resume_generator.ai_generator import ResumeGenerator
+from jobdone.resume_generator.response_cache import ResponseCache
+from jobdone.resume_generator.scheduler import RequestScheduler
+
+TEXT = ' '.join(f"word{i}" for i in range(40))
+
+
+@pytest.fixture
+def serve(serve):
+    return functools.partial(serve, text=TEXT)
+
+
+def make_generator(cache=None, timeout=5.0, max_retries=0):
+    scheduler = RequestScheduler(rate=100, burst=100, max_in_flight=4, max_retries=max_retries)
+    return ResumeGenerator(cache=cache, timeout=timeout, scheduler=scheduler)
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_stream_yields_tokens_as_they_arrive(serve):
+    serve(chunk_delay=0.02)
+    generator = make_generator()
+
+    start = time.monotonic()
+    arrivals, tokens = [], []
+    for token in generator.stream_optimized_content("resume", "job"):
+        arrivals.append(time.monotonic() - start)
+        tokens.append(token)
+
+    assert ''.join(tokens) == TEXT
+    assert len(tokens) == 40
+    # The first token is in hand long before the last one is sent
+    assert arrivals[-1] - arrivals[0] > 0.5
+
+
+def test_astream_yields_tokens_as_they_arrive(serve):
+    serve(chunk_delay=0.02)
+    generator = make_generator()
+
+    async def consume():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        arrivals, tokens = [], []
+        async for token in generator.astream_optimized_content("resume", "job"):
+            arrivals.append(loop.time() - start)
+            tokens.append(token)
+        return arrivals, tokens
+
+    arrivals, tokens = asyncio.run(consume())
+    assert ''.join(tokens) == TEXT
+    assert arrivals[-1] - arrivals[0] > 0.5
+
+
+def test_async_timeout_falls_back_to_original_resume(serve):
+    serve(latency=2.0)
+    generator = make_generator(timeout=0.3)
+
+    start = time.monotonic()
+    content = asyncio.run(generator.agenerate_content("original resume", "job"))
+
+    assert content.fallback
+    assert content.text == "original resume"
+    assert 'TimeoutError' in content.error
+    assert time.monotonic() - start < 1.5
+    assert generator.scheduler.stats()['in_flight'] == 0
+
+
+def test_sync_timeout_falls_back_to_original_resume(serve):
+    serve(latency=2.0)
+    generator = make_generator(timeout=0.3)
+
+    content = generator.generate_content("original resume", "job")
+
+    assert content.fallback
+    assert content.text == "original resume"
+    assert 'Timeout' in content.error
+
+
+def test_cancelling_async_stream_closes_response(serve):
+    server = serve(chunk_delay=0.05)
+    cache = ResponseCache()
+    generator = make_generator(cache=cache)
+
+    async def cancel_after_first_token():
+        first_token = asyncio.Event()
+
+        async def consume():
+            async for _ in generator.astream_optimized_content("resume", "job"):
+                first_token.set()
+
+        task = asyncio.create_task(consume())
+        await first_token.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_after_first_token())
+
+    assert wait_for(lambda: server.counts['disconnected'] == 1)
+    assert server.counts['completed'] == 0
+    assert generator.scheduler.stats()['in_flight'] == 0
+    # The interrupted request is not cached and does not block the next caller
+    assert cache.get(generator._cache_key("resume", "job")) is None
+    assert asyncio.run(generator.agenerate_content("resume", "job")).text == TEXT
+
+
+def test_closing_sync_stream_closes_response(serve):
+    server = serve(chunk_delay=0.05)
+    generator = make_generator(cache=ResponseCache())
+
+    stream = generator.stream_optimized_content("resume", "job")
+    next(stream)
+    stream.close()
+
+    assert wait_for(lambda: server.counts['disconnected'] == 1)
+    assert generator.scheduler.stats()['in_flight'] == 0
+
+
+def test_concurrent_identical_async_prompts_share_one_request(serve):
+    server = serve(latency=0.3)
+    generator = make_generator(cache=ResponseCache())
+
+    async def generate_all():
+        return await asyncio.gather(*[generator.agenerate_content("resume", "job") for _ in range(5)])
+
+    results = asyncio.run(generate_all())
+
+    assert [result.text for result in results] == [TEXT] * 5
+    assert not any(result.fallback for result in results)
+    assert server.counts['requests'] == 1
+
+
+def test_concurrent_identical_sync_prompts_share_one_request(serve):
+    server = serve(latency=0.3)
+    generator = make_generator(cache=ResponseCache())
+
+    with ThreadPoolExecutor(5) as executor:
+        results = list(executor.map(lambda _: generator.generate_content("resume", "job"), range(5)))
+
+    assert [result.text for result in results] == [TEXT] * 5
+    assert server.counts['requests'] == 1
+    # A later identical prompt is answered from the cache
+    assert generator.generate_content("resume", "job").text == TEXT
+    assert server.counts['requests'] == 1
+
+
+def test_sync_followers_stop_waiting_for_an_abandoned_leader(serve):
+    serve(chunk_delay=0.05)
+    generator = make_generator(cache=ResponseCache(), timeout=0.3)
+    # A leader stream that took the key and was left open without being read
+    abandoned = generator.stream_optimized_content("resume", "job")
+    next(abandoned)
+
+    start = time.monotonic()
+    content = generator.generate_content("resume", "job")
+    with pytest.raises(TimeoutError):
+        list(generator.stream_optimized_content("resume", "job"))
+
+    assert content.fallback
+    assert 'TimeoutError' in content.error
+    assert time.monotonic() - start < 1.5
+    abandoned.close()
+
+
+def test_slow_sync_stream_stops_at_the_timeout(serve):
+    server = serve(chunk_delay=0.05)
+    generator = make_generator(timeout=0.5)
+
+    start = time.monotonic()
+    tokens = []
+    with pytest.raises(asyncio.TimeoutError):
+        for token in generator.stream_optimized_content("resume", "job"):
+            tokens.append(token)
+
+    # Every read was well within the timeout, but the stream as a whole was not
+    assert 0 < len(tokens) < 40
+    assert time.monotonic() - start < 1.0
+    assert wait_for(lambda: server.counts['disconnected'] == 1)
+    assert generator.scheduler.stats()['in_flight'] == 0
@@ -0,0 +1,37 @@
+import json
+
+from jobdone.batch.pipeline import completed_ids, read_requests
+
+
+def test_read_requests_reports_bad_lines(tmp_path):
+    jobs = tmp_path / 'jobs.jsonl'
+    jobs.write_text('\n'.join([
+        '{"id": "a", "resume": "r.pdf", "job_description": "j.txt"}',
+        '{not json',
+        '[1, 2]',
+        '"x"',
+        '{"resume": "r.pdf", "job_description": "j.txt"}',
+    ]) + '\n')
+
+    requests = list(read_requests(str(jobs)))
+
+    assert [request['id'] for request in requests] == ['a', 2, 3, 4, 5]
+    assert requests[1]['error'].startswith('Invalid JSON')
+    assert requests[2]['error'] == 'Expected a JSON object, got list'
+    assert requests[3]['error'] == 'Expected a JSON object, got str'
+    assert requests[0]['resume'] == str(tmp_path / 'r.pdf')
+
+
+def test_completed_ids_retries_errors_and_trims_partial_line(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    lines = [
+        {'id': 'ok', 'score': 50.0},
+        {'id': 'failed', 'error': 'TimeoutError: slow disk'},
+        {'id': 'retried', 'error': 'OSError: busy'},
+        {'id': 'retried', 'score': 70.0},
+    ]
+    complete = ''.join(json.dumps(line) + '\n' for line in lines)
+    output.write_text(complete + '{"id": "partial", "sco')
+
+    assert completed_ids(str(output)) == {'ok', 'retried'}
+    assert output.read_text() == complete
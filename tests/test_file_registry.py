@@ -0,0 +1,79 @@
+import io
+
+import pytest
+
+from jobdone.benchmarks.corpus import make_resume, to_pdf
+from jobdone.file_processor.registry import ReaderRegistry, registry
+
+PDF = to_pdf(make_resume(800, seed=1), lines_per_page=20)
+
+
+class BoundedFile(io.RawIOBase):
+    """A file that fails the test if more than `allowed` bytes are read from it."""
+
+    def __init__(self, data, allowed):
+        self.data = data
+        self.allowed = allowed
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        stop = len(self.data) if size is None or size < 0 else self.position + size
+        chunk = self.data[self.position:stop]
+        self.position += len(chunk)
+        assert self.position <= self.allowed, f"read {self.position} bytes, only {self.allowed} allowed"
+        return chunk
+
+
+def make_registry(**pdf_options):
+    reader_registry = ReaderRegistry()
+    fmt = registry._formats['pdf']
+    reader_registry.register('pdf', fmt.reader_path, fmt.extensions, fmt.sniff, options=pdf_options)
+    return reader_registry
+
+
+def test_pdf_reader_is_built_with_registered_options():
+    reader_registry = make_registry(max_pages=3, max_bytes=10_000_000)
+    reader = reader_registry.get_reader('pdf')
+
+    assert (reader.max_pages, reader.max_bytes) == (3, 10_000_000)
+
+
+def test_configure_replaces_reader_options():
+    reader_registry = make_registry()
+    reader_registry.get_reader('pdf')
+    reader_registry.configure('pdf', max_pages=2)
+
+    assert reader_registry.get_reader('pdf').max_pages == 2
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'max_pages': 2}, 'page limit'),
+    ({'max_bytes': 1000}, 'byte limit'),
+])
+def test_pdf_over_either_limit_is_rejected(options, message):
+    reader_registry = make_registry(**options)
+
+    with pytest.raises(Exception, match=message):
+        reader_registry.extract(io.BytesIO(PDF), cache=None)
+
+
+def test_byte_limit_stops_the_read_before_the_whole_file(monkeypatch):
+    reader_registry = make_registry(max_bytes=100_000)
+    hashed = []
+    monkeypatch.setattr('hashlib.sha256', lambda data: hashed.append(data))
+    huge = PDF + b'\0' * 10_000_000
+
+    with pytest.raises(ValueError, match='byte limit'):
+        reader_registry.extract(BoundedFile(huge, allowed=100_001))
+    assert not hashed
+
+
+def test_pdf_within_limits_is_read_in_full():
+    unlimited = make_registry().extract(io.BytesIO(PDF), cache=None)
+    limited = make_registry(max_pages=1000, max_bytes=len(PDF)).extract(io.BytesIO(PDF), cache=None)
+
+    assert limited == unlimited
+    assert unlimited
@@ -0,0 +1,27 @@
+"""Install smoke test: the built package imports and the console script runs."""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_install_provides_packages_and_console_script(tmp_path):
+    target = tmp_path / 'site'
+    subprocess.run([sys.executable, '-m', 'pip', 'install', '--quiet', '--no-deps', '--target', str(target), ROOT],
+                   check=True, cwd=tmp_path)
+
+    package = target / 'jobdone'
+    for module in ('cli.py', 'batch/pipeline.py', 'analyzers/nlp.py', 'service/server.py',
+                   'resume_generator/ai_generator.py', 'job_index/index.py'):
+        assert (package / module).is_file(), module
+    assert (package / 'analyzers' / 'data' / 'skills.txt').is_file()
+    assert (package / 'app' / 'static' / 'css' / 'style.css').is_file()
+
+    script = target / 'bin' / 'jobdone'
+    env = dict(os.environ, PYTHONPATH=str(target))
+    # Run from the temporary directory so the working tree is not importable
+    result = subprocess.run([sys.executable, str(script), '--help'], capture_output=True, text=True,
+                            cwd=tmp_path, env=env)
+    assert result.returncode == 0, result.stderr
+    assert 'batch' in result.stdout and 'serve' in result.stdout
@@ -0,0 +1,68 @@
+import fcntl
+import json
+import threading
+
+from jobdone.job_index.index import LOCK, MANIFEST, JobIndex
+
+
+def leave_interrupted_write(path):
+    (path / MANIFEST).write_text(json.dumps({'segments': [], 'removed': {}, 'next_segment': 1}))
+    # Renamed into place, but the crash came before the manifest listed it
+    orphan = path / 'seg-000001'
+    orphan.mkdir()
+    (orphan / 'indptr.npy').write_bytes(b'')
+    (path / '.tmp-abc123').mkdir()
+    (path / 'manifest123.tmp').write_text('{')
+
+
+def test_opening_an_index_changes_nothing_on_disk(tmp_path):
+    leave_interrupted_write(tmp_path)
+    before = sorted(path.name for path in tmp_path.iterdir())
+
+    index = JobIndex(str(tmp_path))
+
+    assert len(index) == 0
+    assert sorted(path.name for path in tmp_path.iterdir()) == before
+
+
+def test_next_write_removes_leftovers_of_interrupted_writes(tmp_path):
+    leave_interrupted_write(tmp_path)
+    index = JobIndex(str(tmp_path))
+
+    index.compact()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [LOCK, MANIFEST]
+
+
+def test_cleanup_waits_for_the_writer_holding_the_lock(tmp_path):
+    leave_interrupted_write(tmp_path)
+    index = JobIndex(str(tmp_path))
+    with open(tmp_path / LOCK, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        compact = threading.Thread(target=index.compact)
+        compact.start()
+        compact.join(0.2)
+
+        assert compact.is_alive()
+        assert (tmp_path / '.tmp-abc123').exists()
+    compact.join()
+
+    assert not (tmp_path / '.tmp-abc123').exists()
+
+
+def test_writes_pick_up_changes_from_other_processes(tmp_path):
+    index = JobIndex(str(tmp_path))
+    (tmp_path / MANIFEST).write_text(json.dumps({'segments': [], 'removed': {}, 'next_segment': 7}))
+
+    index.compact()
+
+    assert json.loads((tmp_path / MANIFEST).read_text())['next_segment'] == 7
+
+
+def test_segment_names_skip_directories_already_on_disk(tmp_path):
+    index = JobIndex(str(tmp_path))
+    (tmp_path / 'seg-000001').mkdir()
+    (tmp_path / 'seg-000002').mkdir()
+
+    assert index._new_segment_name() == 'seg-000003'
+    assert index._new_segment_name() == 'seg-000004'
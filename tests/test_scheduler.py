@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from groq import APIConnectionError
+
+from jobdone.resume_generator.ai_generator import ResumeGenerator
+from jobdone.resume_generator.scheduler import RequestScheduler, TokenBucket
+
+
+def connection_error():
+    return APIConnectionError(request=httpx.Request('POST', 'http://127.0.0.1/openai/v1/chat/completions'))
+
+
+def test_interrupt_inside_request_releases_the_slot():
+    scheduler = RequestScheduler(rate=100, burst=100, max_in_flight=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.run(interrupted)
+
+    assert scheduler.stats()['in_flight'] == 0
+    assert scheduler.run(lambda: 'ok', deadline=time.monotonic() + 0.5) == 'ok'
+
+
+def test_waiting_for_a_slot_stops_at_the_deadline():
+    scheduler = RequestScheduler(rate=100, burst=100, max_in_flight=1)
+    holding, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with scheduler.request(lambda: None):
+            holding.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    holding.wait()
+    try:
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            scheduler.run(lambda: 'late', deadline=time.monotonic() + 0.2)
+        assert time.monotonic() - start < 1.0
+        assert scheduler.stats() == {'queued': 0, 'in_flight': 1, 'retries': 0, 'failures': 0}
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_retries_stop_at_the_deadline():
+    scheduler = RequestScheduler(rate=100, burst=100, max_retries=5, base_delay=5.0)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise connection_error()
+
+    start = time.monotonic()
+    with pytest.raises((asyncio.TimeoutError, APIConnectionError)):
+        # Jitter may pick a short delay, but never one past the deadline
+        scheduler.run(failing, deadline=time.monotonic() + 0.3)
+    assert time.monotonic() - start < 1.0
+    assert scheduler.stats()['in_flight'] == 0
+
+
+def test_rate_limiter_wait_stops_at_the_deadline_without_debt():
+    scheduler = RequestScheduler(rate=1, burst=1)
+    scheduler.run(lambda: None)
+
+    with pytest.raises(asyncio.TimeoutError):
+        scheduler.run(lambda: None, deadline=time.monotonic() + 0.1)
+    # The caller that gave up did not take a token
+    assert scheduler.bucket.reserve() == pytest.approx(1.0, abs=0.2)
+
+
+def test_token_bucket_only_charges_callers_that_wait():
+    bucket = TokenBucket(rate=1, burst=1)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0.1) is None
+    assert bucket.reserve(max_wait=0.1) is None
+    assert bucket.reserve() == pytest.approx(1.0, abs=0.1)
+
+
+def make_generator(scheduler):
+    return ResumeGenerator(cache=None, timeout=30.0, scheduler=scheduler)
+
+
+def test_throttled_and_failed_requests_are_retried_within_the_cap(serve):
+    server = serve(throttle=0.5, fail=0.2)
+    scheduler = RequestScheduler(rate=100, burst=100, max_in_flight=2, max_retries=30, base_delay=0.05,
+                                 max_delay=1.0)
+    generator = make_generator(scheduler)
+
+    with ThreadPoolExecutor(6) as executor:
+        contents = list(executor.map(lambda i: generator.generate_content(f"resume {i}", "job"), range(6)))
+
+    assert not any(content.fallback for content in contents)
+    assert server.counts['throttled'] > 0 and server.counts['failed'] > 0
+    assert scheduler.stats()['retries'] == server.counts['throttled'] + server.counts['failed']
+    assert server.counts['max_open'] <= scheduler.max_in_flight
+    assert scheduler.stats()['in_flight'] == 0
+
+
+def test_retry_after_is_respected(serve):
+    # The fake server asks for 0.5s; backoff alone would wait at most 10ms
+    server = serve(throttle=0.5)
+    generator = make_generator(RequestScheduler(rate=100, burst=100, max_retries=30, base_delay=0.01))
+
+    start = time.monotonic()
+    for i in range(4):
+        assert not generator.generate_content(f"resume {i}", "job").fallback
+
+    assert server.counts['throttled'] > 0
+    assert time.monotonic() - start >= 0.5 * server.counts['throttled']
+
+
+def test_running_out_of_retries_falls_back(serve):
+    server = serve(fail=1.0)
+    scheduler = RequestScheduler(rate=100, burst=100, max_retries=2, base_delay=0.01)
+    generator = make_generator(scheduler)
+    failures = scheduler.stats()['failures']
+
+    content = generator.generate_content("original resume", "job")
+
+    assert content.fallback
+    assert content.text == "original resume"
+    assert scheduler.stats()['failures'] == failures + 1
+    assert server.counts['failed'] == 3
@@ -0,0 +1,54 @@
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from jobdone.analyzers.score_calculator import ScoreCalculator
+from jobdone.benchmarks.corpus import make_resume
+
+RESUME = "Backend engineer with 6 years of Python, Django and PostgreSQL experience on AWS."
+JOB = ("We are hiring a backend engineer. Requirements: 5+ years of Python experience, "
+       "strong knowledge of PostgreSQL and Kubernetes. Experience with AWS is essential.")
+RESUMES = [
+    RESUME,
+    "",
+    "The and of with to from",
+    "Gardening, pottery and knitting enthusiast",
+    "Python python python Django django PostgreSQL",
+    "AWS",
+] + [make_resume(300, seed=seed) for seed in range(5)]
+
+
+@pytest.fixture
+def calculator():
+    pytest.importorskip('en_core_web_sm')
+    return ScoreCalculator()
+
+
+def two_document_similarity(resume, job):
+    # What calculate_score computes: a TfidfVectorizer fitted on just the pair
+    try:
+        tfidf = TfidfVectorizer(stop_words='english').fit_transform([resume, job])
+    except ValueError:
+        return 0.0
+    return tfidf[0].multiply(tfidf[1]).sum()
+
+
+@pytest.mark.parametrize('job', [JOB, "the and of", make_resume(200, seed=9)])
+def test_similarity_scores_match_two_document_fits(job):
+    expected = [two_document_similarity(resume, job) for resume in RESUMES]
+
+    assert list(ScoreCalculator._similarity_scores(job, RESUMES)) == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_score_many_matches_single_pair_scores(calculator):
+    assert calculator.score_many(JOB, RESUMES) == [calculator.calculate_score(resume, JOB) for resume in RESUMES]
+
+
+def test_score_with_report_matches_separate_calls(calculator, monkeypatch):
+    expected = (calculator.calculate_score(RESUME, JOB), calculator.requirement_report(RESUME, JOB))
+
+    calls = []
+    extract = calculator.extract_key_requirements
+    monkeypatch.setattr(calculator, 'extract_key_requirements', lambda text: calls.append(text) or extract(text))
+
+    assert calculator.score_with_report(RESUME, JOB) == expected
+    assert len(calls) == 1
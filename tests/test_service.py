@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from jobdone.service import server
+from jobdone.service.server import FALLBACK_MARKER, AnalysisService
+
+REQUEST = {'resume': 'original resume', 'job_description': 'job'}
+
+
+# Shared with the forked pool workers
+started = multiprocessing.Value('i', 0)
+loaded = multiprocessing.Value('i', 0)
+
+
+def _no_models(model):
+    pass
+
+
+def _first_worker_loads_fastest(model):
+    with started.get_lock():
+        order = started.value
+        started.value += 1
+    if order:
+        time.sleep(0.5)
+    with loaded.get_lock():
+        loaded.value += 1
+
+
+def _missing_models(model):
+    raise OSError(f"Can't find model '{model}'")
+
+
+class ScriptedGenerator:
+    """Streams `chunks`, then raises `error` if one is given."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    async def astream_optimized_content(self, resume_text, job_desc_text):
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(0)
+                yield chunk
+            if self.error:
+                raise self.error
+        finally:
+            self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def no_models(monkeypatch):
+    # Generation does not touch the analysis workers, so skip loading models
+    monkeypatch.setattr(server, 'init_worker', _no_models)
+
+
+def readiness(service, until):
+    async def get():
+        async with TestClient(TestServer(service.create_app())) as client:
+            while not until(service):
+                await asyncio.sleep(0.01)
+            response = await client.get('/ready')
+            return response.status, await response.json()
+
+    return asyncio.run(get())
+
+
+def test_ready_only_once_every_worker_has_loaded(monkeypatch):
+    monkeypatch.setattr(server, 'init_worker', _first_worker_loads_fastest)
+    started.value = loaded.value = 0
+
+    status, body = readiness(AnalysisService(workers=3), until=lambda service: service.ready)
+
+    assert status == 200
+    assert loaded.value == 3
+
+
+def test_workers_failing_to_start_are_reported(monkeypatch, capsys):
+    monkeypatch.setattr(server, 'init_worker', _missing_models)
+
+    status, body = readiness(AnalysisService(workers=2), until=lambda service: service.warm_up_error)
+
+    assert status == 503
+    assert not body['ready']
+    assert 'BrokenProcessPool' in body['error']
+    assert 'Analysis workers failed to start' in capsys.readouterr().out
+
+
+def generate_text(generator):
+    async def post():
+        service = AnalysisService(workers=1, generator=generator)
+        async with TestClient(TestServer(service.create_app())) as client:
+            while not service.ready:
+                await asyncio.sleep(0.01)
+            response = await client.post('/generate?format=text', json=REQUEST)
+            return response.status, response.headers, await response.text()
+
+    return asyncio.run(post())
+
+
+def test_streams_generated_text():
+    generator = ScriptedGenerator(['Opti', 'mized'])
+    status, _, body = generate_text(generator)
+
+    assert status == 200
+    assert body == 'Optimized'
+    assert generator.closed
+
+
+def test_failure_before_first_token_is_bad_gateway():
+    status, headers, _ = generate_text(ScriptedGenerator([], RuntimeError('upstream down')))
+
+    assert status == 502
+    assert headers['X-Generation-Error'] == 'RuntimeError: upstream down'
+
+
+def test_timeout_before_first_token_is_gateway_timeout():
+    status, headers, _ = generate_text(ScriptedGenerator([], asyncio.TimeoutError()))
+
+    assert status == 504
+    assert 'TimeoutError' in headers['X-Generation-Error']
+
+
+def test_failure_mid_stream_ends_with_fallback():
+    generator = ScriptedGenerator(['Opti', 'mi'], RuntimeError('connection reset'))
+    status, _, body = generate_text(generator)
+
+    assert status == 200
+    assert body == f"Optimi\n{FALLBACK_MARKER} RuntimeError: connection reset\noriginal resume"
+    assert generator.closed